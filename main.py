@@ -3,8 +3,13 @@ import sys
 from typing import Any, List, Optional
 
 from astreum import Node
+from utils.account_cache import configure_account_caches
+from utils.block_cache import configure_block_cache
+from utils.block_rate import configure_block_rate_cache
 from utils.config import load_config, load_node_latest_block_hash
 from utils.data import ensure_data_dir
+from utils.expr_cache import configure_expr_cache
+from utils.tx_search import configure_search_workers
 
 from modes.console import run_console
 
@@ -174,6 +179,11 @@ def main(argv: Optional[List[str]] = None) -> int:
     data_dir = ensure_data_dir()
     configs = load_config(data_dir)
     _apply_config_overrides(configs, config_overrides)
+    configure_block_cache(configs["cli"])
+    configure_block_rate_cache(configs["cli"])
+    configure_account_caches(configs["cli"])
+    configure_expr_cache(configs["cli"])
+    configure_search_workers(configs["cli"])
 
     if args.api_enabled:
         if args.api_port is None:
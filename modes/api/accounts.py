@@ -2,40 +2,45 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 
-from astreum.consensus.block.encoding.decode import get_block_from_storage
-from astreum.consensus.models.accounts import Accounts
 from astreum.expression import ZERO32
 
-from .deps import require_node, hex_encode
+from utils.account_cache import get_cached_account, open_accounts
+from utils.block_cache import get_cached_block
+
+from .body_cache import cached_response, encode_cached_response
+from .deps import check_not_modified, immutable_cache_headers, require_node
+from .executors import run_scan
+from .singleflight import coalesce, single_flight
 
 router = APIRouter()
 
+_account_flight = single_flight("account")
 
-@router.get("/block/{block_id}/account/{address}")
-def get_block_account(block_id: str, address: str, node=Depends(require_node)):
-    """Return account state as of a specific block."""
-    try:
-        block_bytes = bytes.fromhex(block_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid hex block id")
-    try:
-        adr_bytes = bytes.fromhex(address)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid hex account address")
 
+def _load_accounts_hash(node, block_bytes: bytes) -> bytes:
     try:
-        block = get_block_from_storage(node, block_bytes)
+        block = get_cached_block(node, block_bytes)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
     if block.accounts_hash is None or block.accounts_hash == ZERO32:
         raise HTTPException(status_code=404, detail="Block has no accounts")
 
-    accounts = Accounts(root_hash=block.accounts_hash)
+    return block.accounts_hash
+
+
+def _load_account(node, block_bytes: bytes, adr_bytes: bytes) -> dict:
+    return _load_account_at(node, _load_accounts_hash(node, block_bytes), adr_bytes)
+
+
+def _load_account_at(node, accounts_hash: bytes, adr_bytes: bytes) -> dict:
+    # A fresh Accounts view per call: its own lookup dict is not thread-safe,
+    # while the trie nodes behind it are shared through the node cache.
+    accounts = open_accounts(accounts_hash)
     try:
-        account = accounts.get_account(adr_bytes, node)
+        account = get_cached_account(node, accounts, adr_bytes)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to load account: {exc}")
 
@@ -44,8 +49,44 @@ def get_block_account(block_id: str, address: str, node=Depends(require_node)):
 
     return {
         "balance": account.balance,
-        "code_hash": account.code_hash.hex(),
+        "code_hash": account.code_hash,
         "counter": account.counter,
-        "data_hash": account.data_hash.hex(),
-        "channels_hash": account.channels_hash.hex(),
+        "data_hash": account.data_hash,
+        "channels_hash": account.channels_hash,
     }
+
+
+@router.get("/block/{block_id}/account/{address}")
+async def get_block_account(
+    block_id: str,
+    address: str,
+    request: Request,
+    node=Depends(require_node),
+):
+    """Return account state as of a specific block."""
+    cache_headers = immutable_cache_headers(request)
+    not_modified = check_not_modified(request, cache_headers)
+    if not_modified is not None:
+        return not_modified
+    cached = cached_response(cache_headers)
+    if cached is not None:
+        return cached
+    try:
+        block_bytes = bytes.fromhex(block_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid hex block id")
+    try:
+        adr_bytes = bytes.fromhex(address)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid hex account address")
+
+    content = await coalesce(
+        _account_flight,
+        (block_bytes, adr_bytes),
+        run_scan,
+        _load_account,
+        node,
+        block_bytes,
+        adr_bytes,
+    )
+    return encode_cached_response(request, content, cache_headers)
@@ -0,0 +1,262 @@
+"""Admission control — per-class concurrency limits and per-client rate limits.
+
+Every request is put in a route class: ``lookup`` for point reads,
+``scan`` for searches, walks (including expression trees) and batches,
+``submit`` for transaction submission and ``stream`` for head
+subscriptions.  Each class admits at
+most ``cli.api_<class>_max_in_flight`` requests at a time and queues up to
+``cli.api_<class>_max_queued`` more; beyond that requests are shed with
+503.  Each client (by remote address) also has a token bucket per class,
+refilled at ``cli.api_<class>_rate_limit`` requests per second up to
+``cli.api_<class>_rate_burst``; an empty bucket is answered with 429.  Both
+responses carry ``Retry-After``.  Behind a reverse proxy or CDN, list its
+addresses (or CIDR ranges) in ``cli.api_trusted_proxies`` so clients are
+told apart by ``X-Forwarded-For`` instead of all sharing the proxy's
+bucket.
+
+Classes are limited separately, so a client flooding the scan routes fills
+only the scan class and point lookups keep their own capacity.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import math
+import time
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.websockets import WebSocketClose
+
+from utils.cache import LRUCache
+
+ROUTE_CLASSES = ("lookup", "scan", "submit", "stream")
+
+# (max in flight, max queued) per class.
+DEFAULT_CONCURRENCY = {
+    "lookup": (64, 256),
+    "scan": (8, 16),
+    "submit": (4, 16),
+    "stream": (10000, 0),
+}
+# (requests per second, burst) per class; a rate of 0 disables the limit.
+DEFAULT_RATE_LIMITS = {
+    "lookup": (200.0, 400),
+    "scan": (10.0, 40),
+    "submit": (20.0, 100),
+    "stream": (1.0, 10),
+}
+DEFAULT_RATE_LIMIT_MAX_CLIENTS = 10000
+
+# Close code for "try again later" on rejected WebSocket handshakes.
+_WS_TRY_AGAIN_LATER = 1013
+
+_SCAN_PREFIXES = ("/search", "/blocks", "/list/", "/batch/")
+
+
+def route_class(method: str, path: str) -> str:
+    """Return the route class of a request."""
+    if path.startswith("/stream/"):
+        return "stream"
+    if method == "POST" and path in ("/transaction", "/transactions"):
+        return "submit"
+    if (
+        path.startswith(_SCAN_PREFIXES)
+        or (path.startswith("/block/") and "/account/" in path)
+        or (path.startswith("/expr/") and path.endswith("/tree"))
+    ):
+        return "scan"
+    return "lookup"
+
+
+class TokenBucket:
+    """Refills *rate* tokens per second up to *burst*; each request takes one."""
+
+    def __init__(self, rate: float, burst: int, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take a token; return 0 on success, else the seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets of one route class, keyed by client and bounded in number."""
+
+    def __init__(self, *, rate: float, burst: int, max_clients: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._buckets = LRUCache(max_entries=max_clients)
+        self.rejected = 0
+
+    def take(self, client: str) -> float:
+        """Charge one request to *client*; return 0 if allowed, else the seconds to wait."""
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, now)
+            self._buckets.put(client, bucket)
+        wait = bucket.take(now)
+        if wait:
+            self.rejected += 1
+        return wait
+
+
+class AdmissionGate:
+    """Concurrency limit of one route class with a bounded wait queue.
+
+    Only used from the event loop, so the counters need no lock.
+    """
+
+    def __init__(self, name: str, *, concurrency: int, queue_limit: int) -> None:
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_limit = max(0, queue_limit)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self) -> bool:
+        """Wait for a slot; return False at once if the queue is already full."""
+        if self.active + self.waiting >= self.concurrency + self.queue_limit:
+            self.rejected += 1
+            return False
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+
+def _is_trusted(address: str, proxies: tuple) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in proxies)
+
+
+def client_address(scope: Scope, proxies: tuple = ()) -> str:
+    """Return the address rate limits are charged to.
+
+    That is the socket peer, unless the peer is one of the trusted
+    *proxies*: then it is the rightmost ``X-Forwarded-For`` entry not added
+    by a trusted proxy, since entries further left are set by the client
+    and cannot be trusted.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else ""
+    if not proxies or not _is_trusted(peer, proxies):
+        return peer
+    forwarded = [
+        address.strip()
+        for name, value in scope.get("headers") or ()
+        if name == b"x-forwarded-for"
+        for address in value.decode("latin-1").split(",")
+        if address.strip()
+    ]
+    for address in reversed(forwarded):
+        if not _is_trusted(address, proxies):
+            return address
+    return forwarded[0] if forwarded else peer
+
+
+def _build_trusted_proxies(cli_configs: dict[str, Any]) -> tuple:
+    return tuple(
+        ipaddress.ip_network(proxy, strict=False) for proxy in cli_configs.get("api_trusted_proxies") or ()
+    )
+
+
+def _build_gates(cli_configs: dict[str, Any]) -> dict[str, AdmissionGate]:
+    gates = {}
+    for name in ROUTE_CLASSES:
+        concurrency, queue_limit = DEFAULT_CONCURRENCY[name]
+        gates[name] = AdmissionGate(
+            name,
+            concurrency=cli_configs.get(f"api_{name}_max_in_flight", concurrency),
+            queue_limit=cli_configs.get(f"api_{name}_max_queued", queue_limit),
+        )
+    return gates
+
+
+def _build_limiters(cli_configs: dict[str, Any]) -> dict[str, Optional[RateLimiter]]:
+    max_clients = cli_configs.get("api_rate_limit_max_clients", DEFAULT_RATE_LIMIT_MAX_CLIENTS)
+    limiters: dict[str, Optional[RateLimiter]] = {}
+    for name in ROUTE_CLASSES:
+        rate, burst = DEFAULT_RATE_LIMITS[name]
+        rate = cli_configs.get(f"api_{name}_rate_limit", rate)
+        burst = cli_configs.get(f"api_{name}_rate_burst", burst)
+        limiters[name] = RateLimiter(rate=rate, burst=burst, max_clients=max_clients) if rate > 0 else None
+    return limiters
+
+
+gates = _build_gates({})
+limiters = _build_limiters({})
+trusted_proxies: tuple = ()
+
+
+def configure_admission(cli_configs: dict[str, Any]) -> None:
+    """Rebuild the gates and rate limiters from the ``cli.api_<class>_*`` settings."""
+    global gates, limiters, trusted_proxies
+    gates = _build_gates(cli_configs)
+    limiters = _build_limiters(cli_configs)
+    trusted_proxies = _build_trusted_proxies(cli_configs)
+
+
+async def _reject(scope: Scope, receive: Receive, send: Send, status: int, detail: str, retry_after: float) -> None:
+    if scope["type"] == "websocket":
+        await WebSocketClose(code=_WS_TRY_AGAIN_LATER, reason=detail)(scope, receive, send)
+        return
+    response = JSONResponse(
+        status_code=status,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+    await response(scope, receive, send)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying the route-class gates and client rate limits."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        name = route_class(scope.get("method", "GET"), scope["path"])
+        limiter = limiters[name]
+        if limiter is not None:
+            wait = limiter.take(client_address(scope, trusted_proxies))
+            if wait:
+                await _reject(scope, receive, send, 429, "Rate limit exceeded", wait)
+                return
+
+        gate = gates[name]
+        if not await gate.acquire():
+            await _reject(scope, receive, send, 503, f"Server busy ({name} requests)", 1)
+            return
+        try:
+            # Held until the response (or stream) has been fully sent.
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
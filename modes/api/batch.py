@@ -0,0 +1,139 @@
+"""POST /batch/* — resolve many ids in one request.
+
+Each endpoint takes up to ``cli.api_batch_max_ids`` hex ids, resolves them
+concurrently through the same helpers as the single-item routes and
+returns one entry per id, in request order.  Items that fail carry the
+error detail and status code the single-item route would have returned.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+
+from . import executors
+from .accounts import _load_account_at, _load_accounts_hash
+from .block import BLOCK_FIELDS, _load_block
+from .deps import api_setting, parse_fields, require_node
+from .encoding import encode_response
+from .expr import _load_expr
+from .transaction import TRANSACTION_FIELDS, _load_transaction
+
+router = APIRouter()
+
+DEFAULT_BATCH_MAX_IDS = 100
+
+
+def _check_batch_size(ids: list[str]) -> None:
+    max_ids = api_setting("api_batch_max_ids", DEFAULT_BATCH_MAX_IDS)
+    if len(ids) > max_ids:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(ids)} ids exceeds the limit of {max_ids}",
+        )
+
+
+async def _resolve_all(
+    ids: list[str],
+    run: Callable[..., Awaitable[Any]],
+    fn: Callable[..., Any],
+    *args: Any,
+    concurrency: int,
+) -> dict:
+    # Cap in-flight items per batch so one request cannot fill a pool queue.
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _resolve(item_id: str) -> dict:
+        try:
+            key = bytes.fromhex(item_id)
+        except ValueError:
+            return {"id": item_id, "error": "Invalid hex id", "status": 400}
+        async with semaphore:
+            try:
+                result = await run(fn, *args, key)
+            except HTTPException as exc:
+                return {"id": item_id, "error": exc.detail, "status": exc.status_code}
+            except Exception as exc:
+                # One bad stored item must not fail the rest of the batch.
+                return {"id": item_id, "error": str(exc), "status": 500}
+        return {"id": item_id, "result": result}
+
+    results = await asyncio.gather(*(_resolve(item_id) for item_id in ids))
+    return {"results": list(results)}
+
+
+async def _lookup_batch(ids: list[str], fn: Callable[..., Any], node) -> dict:
+    _check_batch_size(ids)
+    return await _resolve_all(
+        ids,
+        executors.run_lookup,
+        fn,
+        node,
+        concurrency=executors.lookup_executor.workers,
+    )
+
+
+@router.post("/batch/blocks")
+async def batch_blocks(
+    request: Request,
+    ids: list[str] = Body(..., embed=True),
+    include_rate: bool = True,
+    fields: Optional[str] = None,
+    node=Depends(require_node),
+):
+    """Return blocks for a list of block expr hashes."""
+    load = functools.partial(
+        _load_block, include_rate=include_rate, fields=parse_fields(fields, BLOCK_FIELDS)
+    )
+    return encode_response(request, await _lookup_batch(ids, load, node))
+
+
+@router.post("/batch/exprs")
+async def batch_exprs(
+    request: Request, ids: list[str] = Body(..., embed=True), node=Depends(require_node)
+):
+    """Return expressions for a list of expr hashes."""
+    return encode_response(request, await _lookup_batch(ids, _load_expr, node))
+
+
+@router.post("/batch/transactions")
+async def batch_transactions(
+    request: Request,
+    ids: list[str] = Body(..., embed=True),
+    fields: Optional[str] = None,
+    node=Depends(require_node),
+):
+    """Return transactions for a list of transaction expr hashes."""
+    load = functools.partial(_load_transaction, fields=parse_fields(fields, TRANSACTION_FIELDS))
+    return encode_response(request, await _lookup_batch(ids, load, node))
+
+
+@router.post("/batch/accounts")
+async def batch_accounts(
+    request: Request,
+    block_id: str = Body(...),
+    addresses: list[str] = Body(...),
+    node=Depends(require_node),
+):
+    """Return account states for a list of addresses as of one block."""
+    _check_batch_size(addresses)
+    try:
+        block_bytes = bytes.fromhex(block_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid hex block id")
+
+    # Resolve the block once; per-address lookups share trie nodes through
+    # the node cache, so shared upper levels still load once.
+    accounts_hash = await executors.run_scan(_load_accounts_hash, node, block_bytes)
+    content = await _resolve_all(
+        addresses,
+        executors.run_scan,
+        _load_account_at,
+        node,
+        accounts_hash,
+        concurrency=executors.scan_executor.workers,
+    )
+    return encode_response(request, content)
@@ -1,73 +1,230 @@
-"""Block endpoints — by hash and by height."""
+"""Block endpoints — by hash, by height and as a streamed height range."""
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 from astreum.consensus.block.encoding.decode import get_block_from_storage
-from astreum.consensus.block.rate import calculate_discount_rate
+from astreum.expression import ZERO32
 
-from .deps import require_node, hex_encode
+from utils.block_cache import get_cached_block
+from utils.block_rate import get_block_rate
+from utils.height_index import get_block_by_height as _get_block_by_height
 
-router = APIRouter()
+from .body_cache import cached_response, encode_cached_response
+from .deps import check_not_modified, immutable_cache_headers, parse_fields, require_node
+from .encoding import encode_json, encode_response
+from .executors import run_lookup, run_scan
+from .singleflight import coalesce, single_flight
 
+router = APIRouter()
 
-def _serialize_block(block, node=None) -> dict:
-    astreum_rate = None
-    if node is not None:
-        try:
-            astreum_rate = calculate_discount_rate(block, node=node)
-        except (ValueError, ZeroDivisionError):
-            pass
-
-    return {
-        "id": hex_encode(block.expr_id),
-        "chain_id": block.chain_id,
-        "height": block.height,
-        "previous_block_hash": hex_encode(block.previous_block_hash),
-        "timestamp": block.timestamp,
-        "difficulty": block.difficulty,
-        "accounts_hash": hex_encode(block.accounts_hash),
-        "transactions_hash": hex_encode(block.transactions_hash),
-        "receipts_hash": hex_encode(block.receipts_hash),
-        "validator_public_key_bytes": hex_encode(block.validator_public_key_bytes),
-        "nonce": block.nonce,
-        "total_transaction_fee": block.total_transaction_fee,
-        "total_storage_fee": block.total_storage_fee,
-        "cumulative_total_fee": block.cumulative_total_fee,
-        "cumulative_stake": block.cumulative_stake,
-        "total_mint": block.total_mint,
-        "body_hash": hex_encode(block.body_hash),
-        "signature": hex_encode(block.signature),
-        "astreum_rate": astreum_rate,
+_block_flight = single_flight("block")
+
+
+# Response field -> Block attribute; ``astreum_rate`` is computed separately.
+_BLOCK_ATTRIBUTES = {
+    "id": "expr_id",
+    **{
+        name: name
+        for name in (
+            "chain_id",
+            "height",
+            "previous_block_hash",
+            "timestamp",
+            "difficulty",
+            "accounts_hash",
+            "transactions_hash",
+            "receipts_hash",
+            "validator_public_key_bytes",
+            "nonce",
+            "total_transaction_fee",
+            "total_storage_fee",
+            "cumulative_total_fee",
+            "cumulative_stake",
+            "total_mint",
+            "body_hash",
+            "signature",
+        )
+    },
+}
+BLOCK_FIELDS = (*_BLOCK_ATTRIBUTES, "astreum_rate")
+
+
+def _serialize_block(
+    block,
+    node=None,
+    *,
+    include_rate: bool = True,
+    fields: Optional[frozenset[str]] = None,
+) -> dict:
+    """Serialize *block*, computing only *fields* (every field when None)."""
+    data = {
+        field: getattr(block, attribute)
+        for field, attribute in _BLOCK_ATTRIBUTES.items()
+        if fields is None or field in fields
     }
+    if include_rate and (fields is None or "astreum_rate" in fields):
+        data["astreum_rate"] = get_block_rate(node, block) if node is not None else None
+    return data
 
 
-@router.get("/block/{block_id}")
-def get_block(block_id: str, node=Depends(require_node)):
-    """Return full block data by its expr hash."""
-    try:
-        block_bytes = bytes.fromhex(block_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid hex block id")
+def _is_complete(content: dict) -> bool:
+    # The rate is None while the parent block is not synced yet, so the
+    # body may still change and must not be cached as immutable.
+    return content.get("astreum_rate", 0) is not None
 
+
+def _load_block(
+    node,
+    block_bytes: bytes,
+    *,
+    include_rate: bool = True,
+    fields: Optional[frozenset[str]] = None,
+) -> dict:
     try:
-        block = get_block_from_storage(node, block_bytes)
+        block = get_cached_block(node, block_bytes)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
-    return _serialize_block(block, node)
-
+    return _serialize_block(block, node, include_rate=include_rate, fields=fields)
 
-@router.get("/block")
-def get_block_by_height(height: int, node=Depends(require_node)):
-    """Return full block data by chain height."""
-    from astreum import get_block as _get_block
 
-    block = _get_block(node, height=height)
+def _load_block_at_height(
+    node,
+    height: int,
+    *,
+    include_rate: bool = True,
+    fields: Optional[frozenset[str]] = None,
+) -> dict:
+    block = _get_block_by_height(node, height)
     if block is None:
         raise HTTPException(
             status_code=404, detail=f"Block at height {height} not found"
         )
 
-    return _serialize_block(block, node)
+    return _serialize_block(block, node, include_rate=include_rate, fields=fields)
+
+
+@router.get("/block/{block_id}")
+async def get_block(
+    block_id: str,
+    request: Request,
+    include_rate: bool = True,
+    fields: Optional[str] = None,
+    node=Depends(require_node),
+):
+    """Return block data by its expr hash (only *fields*, comma-separated, if given)."""
+    cache_headers = immutable_cache_headers(request)
+    not_modified = check_not_modified(request, cache_headers)
+    if not_modified is not None:
+        return not_modified
+    cached = cached_response(cache_headers)
+    if cached is not None:
+        return cached
+    try:
+        block_bytes = bytes.fromhex(block_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid hex block id")
+    selected = parse_fields(fields, BLOCK_FIELDS)
+
+    content = await coalesce(
+        _block_flight,
+        (block_bytes, include_rate, selected),
+        run_lookup,
+        _load_block,
+        node,
+        block_bytes,
+        include_rate=include_rate,
+        fields=selected,
+    )
+    return encode_cached_response(request, content, cache_headers, complete=_is_complete(content))
+
+
+@router.get("/block")
+async def get_block_by_height(
+    height: int,
+    request: Request,
+    include_rate: bool = True,
+    fields: Optional[str] = None,
+    node=Depends(require_node),
+):
+    """Return block data by chain height (only *fields*, comma-separated, if given)."""
+    selected = parse_fields(fields, BLOCK_FIELDS)
+    # Indexed heights are a point lookup; anything else walks the chain.
+    index = getattr(node, "height_index", None)
+    run = run_lookup if index is not None and index.get(height) is not None else run_scan
+    content = await run(_load_block_at_height, node, height, include_rate=include_rate, fields=selected)
+    return encode_response(request, content)
+
+
+def _load_range_top(node, to_height: Optional[int]):
+    if to_height is None:
+        top = node.latest_block
+    else:
+        top = _get_block_by_height(node, to_height)
+    if top is None or top.expr_id is None:
+        raise HTTPException(status_code=404, detail=f"Block at height {to_height} not found")
+    # Walk on fresh decodes: cached blocks must not grow previous_block chains.
+    return get_block_from_storage(node, top.expr_id)
+
+
+def _range_step(node, block, from_height: int, include_rate: bool, fields: Optional[frozenset[str]]):
+    """Serialize *block* as one NDJSON line and load the next block down."""
+    previous = None
+    if block.height > from_height:
+        prev_hash = block.previous_block_hash
+        if prev_hash and prev_hash != ZERO32:
+            previous = get_block_from_storage(node, prev_hash)
+    # The parent is also the rate input, so attach it before serializing.
+    block.previous_block = previous
+    line = encode_json(_serialize_block(block, node, include_rate=include_rate, fields=fields)) + b"\n"
+    block.previous_block = None
+    return line, previous
+
+
+async def _stream_range(
+    node, top, from_height: int, include_rate: bool, fields: Optional[frozenset[str]]
+) -> AsyncIterator[bytes]:
+    block = top if top.height >= from_height else None
+    while block is not None:
+        try:
+            line, next_block = await run_scan(_range_step, node, block, from_height, include_rate, fields)
+        except Exception as exc:
+            # Headers are already sent, so end with a record that tells the
+            # client the range is incomplete and where to resume.
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            yield encode_json({"error": detail, "next_height": block.height}) + b"\n"
+            return
+        yield line
+        block = next_block
+
+
+@router.get("/blocks")
+async def stream_blocks(
+    from_height: int = Query(..., alias="from", ge=0),
+    to_height: Optional[int] = Query(None, alias="to", ge=0),
+    include_rate: bool = True,
+    fields: Optional[str] = None,
+    node=Depends(require_node),
+):
+    """Stream blocks from height *to* (default: latest) down to *from* as NDJSON.
+
+    Walks ``previous_block_hash`` once, so the whole range costs one decode
+    per block and memory stays flat regardless of its size.  Pass *fields*
+    (e.g. ``height,id,timestamp``) to send only those fields.  If a block
+    cannot be loaded partway through, the stream ends with an
+    ``{"error", "next_height"}`` line instead of a block.
+    """
+    if to_height is not None and from_height > to_height:
+        raise HTTPException(status_code=400, detail="from must not exceed to")
+    selected = parse_fields(fields, BLOCK_FIELDS)
+
+    top = await run_scan(_load_range_top, node, to_height)
+    return StreamingResponse(
+        _stream_range(node, top, from_height, include_rate, selected),
+        media_type="application/x-ndjson",
+    )
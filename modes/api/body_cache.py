@@ -0,0 +1,78 @@
+"""Encoded response bodies of content-addressed routes, cached by ETag.
+
+A content-addressed response is fully determined by its URL and the
+negotiated encoding, which is exactly what its ETag hashes (see
+``deps.immutable_cache_headers``).  The encoded body is kept under that
+ETag, so a hit is answered with the stored bytes: no storage read, no
+serializer and no encoder.  Only successful, complete responses are
+stored: a body that may still change is sent with ``Cache-Control:
+no-cache`` instead of the immutable headers.  The cache is bounded by
+``cli.api_body_cache_max_entries`` and ``cli.api_body_cache_max_bytes``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+from utils.cache import LRUCache
+
+from .encoding import encode_response
+
+DEFAULT_BODY_CACHE_MAX_ENTRIES = 65536
+DEFAULT_BODY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Sent instead of the immutable headers on bodies that may still change.
+INCOMPLETE_HEADERS = {"Cache-Control": "no-cache", "Vary": "Accept"}
+
+# Rough per-entry overhead (key, tuple, bytes object) on top of the body.
+_ENTRY_BASE_SIZE = 128
+
+
+def _entry_size(entry: tuple[str, bytes]) -> int:
+    return _ENTRY_BASE_SIZE + len(entry[1])
+
+
+# ETag -> (media type, encoded body).
+body_cache = LRUCache(
+    max_entries=DEFAULT_BODY_CACHE_MAX_ENTRIES,
+    max_bytes=DEFAULT_BODY_CACHE_MAX_BYTES,
+    sizeof=_entry_size,
+)
+
+
+def configure_body_cache(cli_configs: dict[str, Any]) -> None:
+    """Apply the ``cli.api_body_cache_*`` limits to the shared body cache."""
+    body_cache.resize(
+        max_entries=cli_configs.get("api_body_cache_max_entries", DEFAULT_BODY_CACHE_MAX_ENTRIES),
+        max_bytes=cli_configs.get("api_body_cache_max_bytes", DEFAULT_BODY_CACHE_MAX_BYTES),
+    )
+
+
+def cached_response(headers: dict[str, str]) -> Optional[Response]:
+    """Return the stored response for these immutable cache *headers*, if any."""
+    entry = body_cache.get(headers["ETag"])
+    if entry is None:
+        return None
+    media_type, body = entry
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def encode_cached_response(
+    request: Request,
+    content: Any,
+    headers: dict[str, str],
+    *,
+    complete: bool = True,
+) -> Response:
+    """Encode *content* like ``encode_response`` and store the body under its ETag.
+
+    An incomplete body (one that may still change, e.g. while referenced
+    data is not synced yet) is neither stored nor marked immutable.
+    """
+    if not complete:
+        return encode_response(request, content, headers=INCOMPLETE_HEADERS)
+    response = encode_response(request, content, headers=headers)
+    body_cache.put(headers["ETag"], (response.media_type, response.body))
+    return response
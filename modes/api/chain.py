@@ -2,17 +2,35 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
 
-from .deps import require_node
-from .block import _serialize_block
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from .deps import parse_fields, require_node
+from .block import BLOCK_FIELDS, _serialize_block
+from .encoding import encode_response
+from .executors import run_lookup
+from .singleflight import coalesce, single_flight
 
 router = APIRouter()
 
+_chain_flight = single_flight("chain")
+
 
 @router.get("/chain/{chain_id}")
-def get_chain(chain_id: int, node=Depends(require_node)):
-    """Return the latest block for *chain_id*, or null if not tracked."""
+async def get_chain(
+    chain_id: int,
+    request: Request,
+    include_rate: bool = True,
+    fields: Optional[str] = None,
+    node=Depends(require_node),
+):
+    """Return the latest block for *chain_id*, or null if not tracked.
+
+    Pass ``include_rate=false`` to omit ``astreum_rate``, or *fields*
+    (comma-separated) to return only those fields.
+    """
+    selected = parse_fields(fields, BLOCK_FIELDS)
     node_chain_id = node.config.get("chain_id")
     if chain_id != node_chain_id:
         raise HTTPException(
@@ -20,7 +38,18 @@ def get_chain(chain_id: int, node=Depends(require_node)):
             detail=f"Chain {chain_id} not tracked by this node",
         )
 
-    if node.latest_block is None:
-        return None
-
-    return _serialize_block(node.latest_block, node)
+    block = node.latest_block
+    if block is None:
+        return encode_response(request, None)
+
+    content = await coalesce(
+        _chain_flight,
+        (block.expr_id, include_rate, selected),
+        run_lookup,
+        _serialize_block,
+        block,
+        node,
+        include_rate=include_rate,
+        fields=selected,
+    )
+    return encode_response(request, content)
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
-from typing import Optional
+import hashlib
+from typing import Any, Iterable, Optional
+from urllib.parse import urlencode
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Request, Response
 
 from astreum.node import Node
 from astreum.expression import Expr
 
+from .encoding import negotiate
+
 _node: Optional[Node] = None
+_settings: dict[str, Any] = {}
+_primary: Any = None
 
 
 def set_node(node: Node) -> None:
@@ -18,31 +24,106 @@ def set_node(node: Node) -> None:
     _node = node
 
 
-def require_node() -> Node:
+def set_primary(primary: Any) -> None:
+    """Forward writes to *primary* (set in API worker processes; see workers.py)."""
+    global _primary
+    _primary = primary
+
+
+def get_primary() -> Any:
+    """Return the primary-process client, or None when serving in the node process."""
+    return _primary
+
+
+def set_settings(cli_configs: dict[str, Any]) -> None:
+    """Cache the ``cli`` config section for API endpoint access."""
+    global _settings
+    _settings = dict(cli_configs)
+
+
+def api_setting(key: str, default: Any) -> Any:
+    """Return the ``cli.<key>`` setting, or *default* if it is not configured."""
+    return _settings.get(key, default)
+
+
+def parse_fields(fields: Optional[str], available: Iterable[str]) -> Optional[frozenset[str]]:
+    """Parse a ``fields=`` projection (comma-separated names); None selects every field."""
+    if fields is None:
+        return None
+    names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    if not names:
+        raise HTTPException(status_code=400, detail="fields must name at least one field")
+    unknown = names.difference(available)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return names
+
+
+async def require_node() -> Node:
     """Dependency: inject the node, raise 503 if not initialized."""
     if _node is None:
         raise HTTPException(status_code=503, detail="Node not initialized")
     return _node
 
 
-def hex_encode(b: Optional[bytes]) -> Optional[str]:
-    """Return lowercase hex of *b*, or None if *b* is None."""
-    if b is None:
-        return None
-    return b.hex()
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _content_etag(request: Request) -> str:
+    # Content-addressed routes are fully determined by their URL and the
+    # negotiated encoding: hex ids are case-insensitive and query parameter
+    # order does not matter.
+    key = request.url.path.lower()
+    query = sorted(request.query_params.multi_items())
+    if query:
+        key += "?" + urlencode(query)
+    key += "|" + negotiate(request.headers.get("accept"))
+    return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Checked before the resource is resolved, so ``*`` (any current
+    # representation) cannot be honoured: the id may be malformed or
+    # unknown.  Exact ETags are only ever sent for resources that exist.
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def immutable_cache_headers(request: Request) -> dict[str, str]:
+    """Return ``ETag`` and long-lived ``Cache-Control`` headers for a content-addressed route.
+
+    Only attach them to successful responses, since a missing expr may
+    still arrive later.
+    """
+    return {
+        "ETag": _content_etag(request),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Vary": "Accept",
+    }
+
+
+def check_not_modified(request: Request, headers: dict[str, str]) -> Optional[Response]:
+    """Return a 304 if ``If-None-Match`` names this ETag, so storage can be skipped."""
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return None
 
 
 def serialize_expr(expr: Expr) -> dict:
-    """Serialize an Expr to a JSON-compatible dict."""
+    """Serialize an Expr to a dict; see encoding.py for how bytes are rendered."""
     if expr.base == "symbol":
         return {"type": "symbol", "value": expr.value}
     if expr.base == "bytes":
-        return {"type": "bytes", "value": expr.value.hex(), "size": expr.size()}
+        return {"type": "bytes", "value": expr.value, "size": expr.size()}
     if expr.base == "link":
         return {
             "type": "link",
-            "head_hash": (expr.head_hash or expr.head.hash()).hex(),
-            "tail_hash": (expr.tail_hash or expr.tail.hash()).hex(),
+            "head_hash": expr.head_hash or expr.head.hash(),
+            "tail_hash": expr.tail_hash or expr.tail.hash(),
             "size": expr.size(),
         }
     return {"type": "unknown"}
@@ -0,0 +1,124 @@
+"""Response encodings — JSON, CBOR and MessagePack.
+
+Serializers in this package return plain dicts and lists whose hashes,
+keys and signatures are raw ``bytes``.  The encoder is chosen from the
+request's ``Accept`` header: CBOR and MessagePack carry those fields as
+raw bytes, JSON renders them as lowercase hex.  All three skip FastAPI's
+``jsonable_encoder`` pass.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Mapping, Optional
+
+import cbor2
+import msgpack
+import orjson
+from fastapi import Request, Response
+
+JSON = "application/json"
+CBOR = "application/cbor"
+MSGPACK = "application/msgpack"
+
+_MEDIA_TYPES = {
+    JSON: JSON,
+    CBOR: CBOR,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+_INT64_MIN = -(1 << 63)
+_UINT64_MAX = (1 << 64) - 1
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Return the supported media type the ``Accept`` header prefers (JSON by default)."""
+    if not accept:
+        return JSON
+    best, best_q = JSON, 0.0
+    for part in accept.split(","):
+        media, _, params = part.strip().partition(";")
+        media_type = _MEDIA_TYPES.get(media.strip().lower())
+        if media_type is None:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = media_type, q
+    return best
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return bytes(obj).hex()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode *content* as JSON with bytes rendered as hex."""
+    try:
+        return orjson.dumps(content, default=_json_default)
+    except orjson.JSONEncodeError:
+        # orjson rejects integers beyond 64 bits; amounts are unbounded.
+        return json.dumps(content, default=_json_default, separators=(",", ":")).encode()
+
+
+def encode_cbor(content: Any) -> bytes:
+    """Encode *content* as CBOR with bytes kept raw."""
+    return cbor2.dumps(content)
+
+
+def _msgpack_safe(obj: Any) -> Any:
+    if isinstance(obj, int) and not _INT64_MIN <= obj <= _UINT64_MAX:
+        return str(obj)
+    if isinstance(obj, dict):
+        return {key: _msgpack_safe(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_msgpack_safe(value) for value in obj]
+    return obj
+
+
+def encode_msgpack(content: Any) -> bytes:
+    """Encode *content* as MessagePack with bytes kept raw.
+
+    Integers outside the 64-bit range have no MessagePack form and are sent
+    as decimal strings.
+    """
+    try:
+        return msgpack.packb(content, use_bin_type=True)
+    except OverflowError:
+        return msgpack.packb(_msgpack_safe(content), use_bin_type=True)
+
+
+_ENCODERS: dict[str, Callable[[Any], bytes]] = {
+    JSON: encode_json,
+    CBOR: encode_cbor,
+    MSGPACK: encode_msgpack,
+}
+
+
+def encode_response(
+    request: Request,
+    content: Any,
+    *,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Encode *content* in the media type negotiated from *request*."""
+    media_type = negotiate(request.headers.get("accept"))
+    response = Response(
+        content=_ENCODERS[media_type](content),
+        status_code=status_code,
+        media_type=media_type,
+        headers=dict(headers or {}),
+    )
+    response.headers["Vary"] = "Accept"
+    return response
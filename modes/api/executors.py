@@ -0,0 +1,110 @@
+"""Bounded thread pools for blocking node and storage calls.
+
+Handlers are ``async def`` and hand their blocking work to one of two
+separately sized pools: ``lookup`` for cheap point reads (an expr, a block
+by hash) and ``scan`` for expensive walks (searches, account tries, list
+resolution, broadcasts).  Each pool admits at most ``workers + queue_limit``
+pending calls; beyond that the request fails fast with 503 so a burst of
+heavy queries cannot starve the cheap routes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+DEFAULT_LOOKUP_WORKERS = 16
+DEFAULT_LOOKUP_QUEUE_LIMIT = 256
+DEFAULT_SCAN_WORKERS = 4
+DEFAULT_SCAN_QUEUE_LIMIT = 16
+
+
+class BoundedExecutor:
+    """A thread pool that rejects work once its queue is full."""
+
+    def __init__(self, name: str, *, workers: int, queue_limit: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix=f"astreum-api-{name}",
+        )
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on the pool and await its result."""
+        with self._lock:
+            if self.pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Server busy ({self.name} queue full)",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+
+        try:
+            future = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release(None)
+            raise
+        # Release on completion rather than when the awaiting request goes
+        # away, so cancelled requests still count until their thread is free.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future: Any) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+lookup_executor = BoundedExecutor(
+    "lookup",
+    workers=DEFAULT_LOOKUP_WORKERS,
+    queue_limit=DEFAULT_LOOKUP_QUEUE_LIMIT,
+)
+scan_executor = BoundedExecutor(
+    "scan",
+    workers=DEFAULT_SCAN_WORKERS,
+    queue_limit=DEFAULT_SCAN_QUEUE_LIMIT,
+)
+
+
+def configure_executors(cli_configs: dict[str, Any]) -> None:
+    """Rebuild both pools from the ``cli.api_*_workers`` / ``*_queue_limit`` settings."""
+    global lookup_executor, scan_executor
+    lookup_executor.shutdown()
+    scan_executor.shutdown()
+    lookup_executor = BoundedExecutor(
+        "lookup",
+        workers=cli_configs.get("api_lookup_workers", DEFAULT_LOOKUP_WORKERS),
+        queue_limit=cli_configs.get("api_lookup_queue_limit", DEFAULT_LOOKUP_QUEUE_LIMIT),
+    )
+    scan_executor = BoundedExecutor(
+        "scan",
+        workers=cli_configs.get("api_scan_workers", DEFAULT_SCAN_WORKERS),
+        queue_limit=cli_configs.get("api_scan_queue_limit", DEFAULT_SCAN_QUEUE_LIMIT),
+    )
+
+
+async def run_lookup(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a cheap point lookup on the lookup pool."""
+    return await lookup_executor.run(fn, *args, **kwargs)
+
+
+async def run_scan(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run an expensive scan or write on the scan pool."""
+    return await scan_executor.run(fn, *args, **kwargs)
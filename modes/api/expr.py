@@ -1,28 +1,141 @@
-"""GET /expr/{expr_id} endpoint."""
+"""GET /expr/{expr_id} endpoints — a single node or a whole subtree."""
 
 from __future__ import annotations
 
+import asyncio
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from astreum.expression import Expr
-from astreum.storage.get.single import get_expr
+from astreum.expression import Expr, ZERO32
 
-from .deps import require_node, serialize_expr
+from utils.expr_cache import get_cached_expr
+
+from . import executors
+from .body_cache import cached_response, encode_cached_response
+from .deps import api_setting, check_not_modified, immutable_cache_headers, require_node, serialize_expr
+from .executors import run_lookup
+from .singleflight import coalesce, single_flight
 
 router = APIRouter()
 
+DEFAULT_EXPR_TREE_MAX_NODES = 4096
+
+_expr_flight = single_flight("expr")
+
+
+def _load_expr(node, expr_id_bytes: bytes) -> dict:
+    expr: Optional[Expr] = get_cached_expr(node, expr_id_bytes)
+    if expr is None:
+        raise HTTPException(status_code=404, detail="Expression not found")
+    return serialize_expr(expr)
+
 
 @router.get("/expr/{expr_id}")
-def get_expr_by_hash(expr_id: str, node=Depends(require_node)):
+async def get_expr_by_hash(
+    expr_id: str, request: Request, node=Depends(require_node)
+):
     """Return a single expression by its blake3 hash (64-char hex)."""
+    cache_headers = immutable_cache_headers(request)
+    not_modified = check_not_modified(request, cache_headers)
+    if not_modified is not None:
+        return not_modified
+    cached = cached_response(cache_headers)
+    if cached is not None:
+        return cached
     try:
         expr_id_bytes = bytes.fromhex(expr_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid hex expression id")
 
-    expr: Optional[Expr] = get_expr(node, expr_id_bytes)
-    if expr is None:
-        raise HTTPException(status_code=404, detail="Expression not found")
-    return serialize_expr(expr)
+    content = await coalesce(_expr_flight, expr_id_bytes, run_lookup, _load_expr, node, expr_id_bytes)
+    return encode_cached_response(request, content, cache_headers)
+
+
+def _child_hashes(expr: Expr) -> list[bytes]:
+    if expr.base != "link":
+        return []
+    children = [expr.head_hash or expr.head.hash(), expr.tail_hash or expr.tail.hash()]
+    # The all-zero hash is nil; it is never fetched or listed.
+    return [child for child in children if child != ZERO32]
+
+
+async def _load_expr_tree(node, root: bytes, depth: Optional[int], max_nodes: int) -> dict:
+    """Resolve the DAG under *root* breadth first, one concurrent fetch per level.
+
+    Each expr is fetched once however many parents share it.  Stops below
+    *depth* levels or at *max_nodes* nodes, setting ``truncated`` when
+    children were left unresolved.
+    """
+    semaphore = asyncio.Semaphore(executors.lookup_executor.workers)
+
+    async def _fetch(expr_id: bytes) -> Optional[Expr]:
+        async with semaphore:
+            return await run_lookup(get_cached_expr, node, expr_id)
+
+    nodes: dict[str, dict] = {}
+    missing: list[bytes] = []
+    seen = {root}
+    level = [root]
+    level_depth = 0
+    truncated = False
+    while level:
+        exprs = await asyncio.gather(*(_fetch(expr_id) for expr_id in level))
+        next_level: list[bytes] = []
+        for expr_id, expr in zip(level, exprs):
+            if expr is None:
+                if expr_id == root:
+                    raise HTTPException(status_code=404, detail="Expression not found")
+                missing.append(expr_id)
+                continue
+            nodes[expr_id.hex()] = serialize_expr(expr)
+            for child in _child_hashes(expr):
+                if child in seen:
+                    continue
+                if (depth is not None and level_depth >= depth) or len(seen) >= max_nodes:
+                    truncated = True
+                    continue
+                seen.add(child)
+                next_level.append(child)
+        level = next_level
+        level_depth += 1
+
+    return {
+        "root": root,
+        "nodes": nodes,
+        "missing": missing,
+        "truncated": truncated,
+    }
+
+
+@router.get("/expr/{expr_id}/tree")
+async def get_expr_tree(
+    expr_id: str,
+    request: Request,
+    depth: Optional[int] = Query(None, ge=0),
+    max_nodes: Optional[int] = Query(None, ge=1),
+    node=Depends(require_node),
+):
+    """Return the expression DAG under *expr_id* as a flat table keyed by hex hash.
+
+    *depth* limits how many levels below the root are resolved (default:
+    all) and *max_nodes* how many nodes are returned (default and upper
+    bound ``cli.api_expr_tree_max_nodes``).  Shared subtrees appear once.
+    Children that could not be found are listed in ``missing``.
+    """
+    cache_headers = immutable_cache_headers(request)
+    not_modified = check_not_modified(request, cache_headers)
+    if not_modified is not None:
+        return not_modified
+    cached = cached_response(cache_headers)
+    if cached is not None:
+        return cached
+    try:
+        root = bytes.fromhex(expr_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid hex expression id")
+
+    limit = api_setting("api_expr_tree_max_nodes", DEFAULT_EXPR_TREE_MAX_NODES)
+    content = await _load_expr_tree(node, root, depth, min(max_nodes or limit, limit))
+    # Missing children may still arrive, so only a complete tree is immutable.
+    return encode_cached_response(request, content, cache_headers, complete=not content["missing"])
@@ -1,29 +1,183 @@
-"""GET /list/{root_id} endpoint."""
+"""GET /list/{root_id} endpoint — paged, cursored or streamed as NDJSON.
+
+Lists are walked lazily one link at a time: links before the window are
+fetched only for their tail hash, and heads are resolved only inside it.
+The continuation cursor is the hash of the first link after the window,
+so resuming costs nothing for the links already served.  Heads that
+cannot be loaded are left out and reported as missing.
+"""
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from astreum.expression import Expr, NIL, ZERO32
 
-from astreum.storage.get.list import get_expr_list
+from utils.expr_cache import get_cached_expr
 
-from .deps import require_node, serialize_expr
+from .body_cache import INCOMPLETE_HEADERS
+from .deps import check_not_modified, immutable_cache_headers, require_node, serialize_expr
+from .encoding import encode_json, encode_response
+from .executors import run_scan
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MISSING_HEADS_HEADER = "X-Missing-Heads"
+STREAM_CHUNK_SIZE = 64
+
+
+def _next_link_hash(link: Expr) -> Optional[bytes]:
+    if link.tail_hash is not None:
+        return None if link.tail_hash == ZERO32 else link.tail_hash
+    if link.tail is not None and link.tail.base == "link":
+        return link.tail.hash()
+    return None
+
+
+def _resolve_head(node, link: Expr) -> Optional[Expr]:
+    if link.head is not None:
+        return link.head
+    if link.head_hash is None:
+        return None
+    if link.head_hash == ZERO32:
+        return NIL
+    return get_cached_expr(node, link.head_hash)
+
+
+def _load_list_page(
+    node,
+    start_hash: bytes,
+    offset: int,
+    limit: Optional[int],
+) -> tuple[list[dict], Optional[bytes], list[bytes]]:
+    """Serialize up to *limit* items after skipping *offset* links from *start_hash*.
+
+    Returns the items, the hash of the next unread link (None at the end of
+    the list) and the hashes of heads in the window that could not be
+    loaded.  Those heads are skipped, as resolve_list_exprs does, but still
+    count towards *limit*.
+    """
+    items: list[dict] = []
+    missing: list[bytes] = []
+    link_hash: Optional[bytes] = start_hash
+    position = 0
+    while link_hash is not None and (limit is None or len(items) + len(missing) < limit):
+        link = get_cached_expr(node, link_hash)
+        if link is None:
+            detail = "Expr list not found" if link_hash == start_hash else "Expr list link not found"
+            raise HTTPException(status_code=404, detail=detail)
+        if link.base != "link":
+            return items, None, missing
+        if position >= offset:
+            head = _resolve_head(node, link)
+            if head is not None:
+                items.append(serialize_expr(head))
+            elif link.head_hash is not None:
+                missing.append(link.head_hash)
+        position += 1
+        link_hash = _next_link_hash(link)
+    return items, link_hash, missing
+
+
+async def _stream_list(
+    node,
+    items: list[dict],
+    link_hash: Optional[bytes],
+    remaining: Optional[int],
+    missing: list[bytes],
+) -> AsyncIterator[bytes]:
+    error: Optional[dict] = None
+    while True:
+        if items:
+            yield b"".join(encode_json(item) + b"\n" for item in items)
+        if link_hash is None or remaining == 0:
+            break
+        chunk = STREAM_CHUNK_SIZE if remaining is None else min(remaining, STREAM_CHUNK_SIZE)
+        try:
+            items, next_hash, chunk_missing = await run_scan(_load_list_page, node, link_hash, 0, chunk)
+        except Exception as exc:
+            # Headers are already sent, so end with a record that tells the
+            # client the list is incomplete and where to resume.
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            error = {"error": detail, "next_cursor": link_hash}
+            break
+        link_hash = next_hash
+        missing.extend(chunk_missing)
+        if remaining is not None:
+            remaining -= len(items) + len(chunk_missing)
+    if missing:
+        yield encode_json({"missing": missing}) + b"\n"
+    if error is not None:
+        yield encode_json(error) + b"\n"
+
 
 @router.get("/list/{root_id}")
-def get_expr_list_by_hash(root_id: str, node=Depends(require_node)):
-    """Return the Expr list chain from the given root hash."""
+async def get_expr_list_by_hash(
+    root_id: str,
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    node=Depends(require_node),
+):
+    """Return the Expr list chain from the given root hash.
+
+    Without *limit* the whole list is returned.  With *limit*, at most that
+    many items follow *offset*, and the ``X-Next-Cursor`` response header
+    carries the cursor for the next page, if any.  Pass it back as *cursor*
+    (with the same *root_id*) to continue.  ``stream=true`` sends the items
+    as NDJSON instead, walking the list in chunks.
+
+    Heads that could not be loaded are left out and their hashes listed in
+    the ``X-Missing-Heads`` header, or in a final ``{"missing": [...]}``
+    line when streaming.  Such responses are not marked immutable.  A
+    stream that cannot load a later link ends with an
+    ``{"error", "next_cursor"}`` line; pass that cursor back to resume.
+    """
+    cache_headers = immutable_cache_headers(request)
+    not_modified = check_not_modified(request, cache_headers)
+    if not_modified is not None:
+        return not_modified
+
     try:
         root_bytes = bytes.fromhex(root_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid hex list root id")
+    start_hash = root_bytes
+    if cursor is not None:
+        try:
+            start_hash = bytes.fromhex(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid list cursor")
+        if len(start_hash) != 32:
+            raise HTTPException(status_code=400, detail="Invalid list cursor")
 
-    header = get_expr_list(node, root_bytes)
-    if header is None:
-        raise HTTPException(status_code=404, detail="Expr list not found")
-
-    from astreum.expression.helpers import resolve_list_exprs
+    if stream:
+        # Load the first chunk up front so a missing list is still a 404.
+        chunk = STREAM_CHUNK_SIZE if limit is None else min(limit, STREAM_CHUNK_SIZE)
+        items, next_hash, missing = await run_scan(_load_list_page, node, start_hash, offset, chunk)
+        remaining = None if limit is None else limit - len(items) - len(missing)
+        # Later chunks may still hit missing heads, so only a window that
+        # was loaded whole and complete is immutable.
+        complete = not missing and (next_hash is None or remaining == 0)
+        return StreamingResponse(
+            _stream_list(node, items, next_hash, remaining, missing),
+            media_type="application/x-ndjson",
+            headers=cache_headers if complete else INCOMPLETE_HEADERS,
+        )
 
-    items, _ = resolve_list_exprs(node, header)
-    return [serialize_expr(e) for e in items]
+    items, next_hash, missing = await run_scan(_load_list_page, node, start_hash, offset, limit)
+    # Missing heads may still arrive, so only a complete page is immutable.
+    if missing:
+        headers = dict(INCOMPLETE_HEADERS)
+        headers[MISSING_HEADS_HEADER] = ",".join(head_hash.hex() for head_hash in missing)
+    else:
+        headers = dict(cache_headers)
+    if next_hash is not None:
+        headers[NEXT_CURSOR_HEADER] = next_hash.hex()
+    return encode_response(request, items, headers=headers)
@@ -0,0 +1,224 @@
+"""GET /metrics — Prometheus text exposition of API and node metrics.
+
+Per-route request counts and latencies are recorded by ``MetricsMiddleware``
+(labelled by route template, so ids do not multiply series).  Everything
+else — admission and pool gauges, single-flight and cache counters, poller
+and node state — is read from existing counters when the endpoint is
+scraped, so it costs nothing on the request path.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.account_cache import account_cache, trie_node_cache
+from utils.block_cache import block_cache
+from utils.block_rate import rate_cache
+from utils.expr_cache import expr_cache
+from utils.latest_block import poller_loop_seconds
+from utils.metrics import Counter, Histogram, render_counter, render_gauge
+
+from . import admission, executors
+from .body_cache import body_cache
+from .deps import require_node
+from .singleflight import flights
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+requests_total = Counter(
+    "astreum_api_requests_total",
+    "API requests by route template, method and status.",
+    ("route", "method", "status"),
+)
+request_seconds = Histogram(
+    "astreum_api_request_seconds",
+    "API request latency by route template and method, until the response is fully sent.",
+    ("route", "method"),
+)
+
+# Requests inside the app; only touched from the event loop.
+_in_flight = 0
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global _in_flight
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        status = "ws" if scope["type"] == "websocket" else "500"
+
+        async def _send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _in_flight -= 1
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope.get("method", "WS")
+            requests_total.inc(path, method, status)
+            request_seconds.observe(time.perf_counter() - started, path, method)
+
+
+def _cache_lines() -> list[str]:
+    caches = {
+        "block": block_cache,
+        "block_rate": rate_cache,
+        "account": account_cache,
+        "account_trie_node": trie_node_cache,
+        "expr": expr_cache,
+        "api_body": body_cache,
+    }
+    stats = {name: cache.stats() for name, cache in caches.items()}
+
+    def _ratio(entry: dict[str, int]) -> Optional[float]:
+        lookups = entry["hits"] + entry["misses"]
+        return entry["hits"] / lookups if lookups else None
+
+    return (
+        render_counter(
+            "astreum_cache_hits_total", "Cache hits.",
+            [((("cache", name),), entry["hits"]) for name, entry in stats.items()],
+        )
+        + render_counter(
+            "astreum_cache_misses_total", "Cache misses.",
+            [((("cache", name),), entry["misses"]) for name, entry in stats.items()],
+        )
+        + render_gauge(
+            "astreum_cache_hit_ratio", "Cache hits over lookups since start.",
+            [((("cache", name),), _ratio(entry)) for name, entry in stats.items()],
+        )
+        + render_gauge(
+            "astreum_cache_entries", "Entries currently cached.",
+            [((("cache", name),), entry["entries"]) for name, entry in stats.items()],
+        )
+    )
+
+
+def _admission_lines() -> list[str]:
+    gates = admission.gates
+    limiters = admission.limiters
+    pools = {"lookup": executors.lookup_executor, "scan": executors.scan_executor}
+    return (
+        render_gauge("astreum_api_in_flight", "Requests being handled.", [((), _in_flight)])
+        + render_gauge(
+            "astreum_api_class_in_flight", "Admitted requests running, by route class.",
+            [((("class", name),), gate.active) for name, gate in gates.items()],
+        )
+        + render_gauge(
+            "astreum_api_class_queued", "Requests waiting for admission, by route class.",
+            [((("class", name),), gate.waiting) for name, gate in gates.items()],
+        )
+        + render_counter(
+            "astreum_api_shed_total", "Requests rejected with 503 by admission control.",
+            [((("class", name),), gate.rejected) for name, gate in gates.items()],
+        )
+        + render_counter(
+            "astreum_api_rate_limited_total", "Requests rejected with 429 by client rate limits.",
+            [((("class", name),), limiter.rejected) for name, limiter in limiters.items() if limiter is not None],
+        )
+        + render_gauge(
+            "astreum_api_pool_pending", "Calls queued or running on an API thread pool.",
+            [((("pool", name),), pool.pending) for name, pool in pools.items()],
+        )
+        + render_counter(
+            "astreum_api_pool_rejected_total", "Calls rejected because an API thread pool queue was full.",
+            [((("pool", name),), pool.rejected) for name, pool in pools.items()],
+        )
+    )
+
+
+def _coalescing_lines() -> list[str]:
+    return (
+        render_counter(
+            "astreum_api_singleflight_calls_total", "Lookups actually run, by route.",
+            [((("route", name),), flight.calls) for name, flight in flights.items()],
+        )
+        + render_counter(
+            "astreum_api_singleflight_coalesced_total", "Requests served by joining an identical in-flight lookup.",
+            [((("route", name),), flight.coalesced) for name, flight in flights.items()],
+        )
+        + render_gauge(
+            "astreum_api_singleflight_in_flight", "Distinct lookups in flight, by route.",
+            [((("route", name),), flight.in_flight) for name, flight in flights.items()],
+        )
+    )
+
+
+def _decode_lag(node: Any) -> Optional[float]:
+    """Seconds the poller has held a latest hash it has not decoded yet (0 when in sync)."""
+    latest_hash = node.latest_block_hash
+    if latest_hash is None:
+        return None
+    latest_block = node.latest_block
+    if latest_block is not None and latest_block.expr_id == latest_hash:
+        return 0.0
+    seen = getattr(node, "_latest_block_hash_seen", None)
+    if seen is None or seen[0] != latest_hash:
+        return None
+    return time.monotonic() - seen[1]
+
+
+def _node_lines(node: Any) -> list[str]:
+    latest_block = node.latest_block
+    peer_count = len(getattr(node, "peers", {}))
+    queue = getattr(node, "_validation_transaction_queue", None)
+    return (
+        render_gauge(
+            "astreum_latest_block_height", "Height of the decoded latest block.",
+            [((), None if latest_block is None else latest_block.height)],
+        )
+        + render_gauge(
+            "astreum_latest_block_decode_lag_seconds",
+            "Time the latest block hash has gone without a matching decoded block.",
+            [((), _decode_lag(node))],
+        )
+        + render_counter(
+            "astreum_block_fetch_failures_total", "Failed attempts to decode the latest block.",
+            [((), getattr(node, "_block_fetch_attempts", 0))],
+        )
+        + render_gauge("astreum_peers", "Connected peers.", [((), peer_count)])
+        + render_gauge(
+            "astreum_validation_queue_depth", "Transactions waiting in the local validation queue.",
+            [((), None if queue is None else queue.qsize())],
+        )
+    )
+
+
+def render_metrics(node: Any) -> str:
+    lines = (
+        requests_total.render()
+        + request_seconds.render()
+        + _admission_lines()
+        + _coalescing_lines()
+        + _cache_lines()
+        + poller_loop_seconds.render()
+        + _node_lines(node)
+    )
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(node=Depends(require_node)):
+    """Return API and node metrics in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(node), media_type=CONTENT_TYPE)
@@ -2,38 +2,54 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Callable, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from astreum import find_transactions
-from astreum.consensus.block.encoding.decode import get_block_from_storage
+from utils.block_cache import get_cached_block
+from utils.height_index import get_block_by_height
+from utils.tx_search import (
+    SearchBudget,
+    decode_search_cursor,
+    encode_search_cursor,
+    find_transactions,
+)
 
-from .deps import require_node, hex_encode
+from .deps import api_setting, parse_fields, require_node
+from .encoding import encode_response
+from .executors import run_scan
 
 router = APIRouter()
 
+DEFAULT_MAX_BLOCKS_SCANNED = 10000
+DEFAULT_TIMEOUT_MS = 5000
+
+
+_TX_FIELDS: dict[str, Callable[[Any], Any]] = {
+    "id": lambda tx: tx.expr_id or tx.hash,
+    "block_hash": lambda tx: tx.block_hash,
+    "chain_id": lambda tx: tx.chain_id,
+    "amount": lambda tx: tx.amount,
+    "code": lambda tx: tx.code.name if hasattr(tx.code, "name") else int(tx.code),
+    "counter": lambda tx: tx.counter,
+    "cost_limit": lambda tx: tx.cost_limit,
+    "data": lambda tx: (tx.data.value if tx.data is not None and tx.data.base == "bytes" and tx.data.value else b""),
+    "recipient": lambda tx: tx.recipient,
+    "sender": lambda tx: tx.sender,
+    "signature": lambda tx: tx.signature,
+    "body_hash": lambda tx: tx.body_hash,
+}
+SEARCH_RESULT_FIELDS = tuple(_TX_FIELDS)
 
-def _serialize_tx(tx) -> dict:
-    """Serialize a Transaction to a JSON-compatible dict."""
-    return {
-        "id": hex_encode(tx.expr_id or tx.hash),
-        "block_hash": hex_encode(tx.block_hash),
-        "chain_id": tx.chain_id,
-        "amount": tx.amount,
-        "code": tx.code.name if hasattr(tx.code, "name") else int(tx.code),
-        "counter": tx.counter,
-        "cost_limit": tx.cost_limit,
-        "data": (tx.data.value.hex() if tx.data is not None and tx.data.base == "bytes" and tx.data.value else ""),
-        "recipient": tx.recipient.hex(),
-        "sender": tx.sender.hex(),
-        "signature": hex_encode(tx.signature),
-        "body_hash": hex_encode(tx.body_hash),
-    }
+
+def _serialize_tx(tx, fields: Optional[frozenset[str]] = None) -> dict:
+    """Serialize a Transaction to a dict of raw fields (only *fields* when given)."""
+    return {name: get(tx) for name, get in _TX_FIELDS.items() if fields is None or name in fields}
 
 
 @router.get("/search")
-def search_transactions(
+async def search_transactions(
+    request: Request,
     tx_hash: Optional[str] = None,
     sender: Optional[str] = None,
     receiver: Optional[str] = None,
@@ -43,18 +59,38 @@ def search_transactions(
     end_block_hash: Optional[str] = None,
     end_block_height: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
+    max_blocks_scanned: Optional[int] = Query(None, ge=1),
+    timeout_ms: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = None,
     node=Depends(require_node),
 ):
     """Search for transactions matching filter args.
 
     Walks backward from start_height (or the block hash) looking for
-    matching transactions via bloom filters.  Stops at end_block_height
+    matching transactions, through the on-disk transaction index when it
+    covers the requested range and era by era (in parallel) through the
+    bloom matrix or bloom trees otherwise.  Stops at end_block_height
     or the end_block hash (default 0 = genesis) or when limit results
     are found.
 
     Args are hex-encoded bytes.  At least one of tx_hash, sender, receiver,
     or key must be provided.  Provide start_block_hash or start_block_height, not both.
     Provide end_block_hash or end_block_height, not both.
+
+    When *limit* results are found the response carries a ``next_cursor``;
+    pass it back as *cursor* (with the same filters and end block, and no
+    start block) to resume the scan exactly where it stopped.
+
+    Each search is limited to *max_blocks_scanned* block decodes and
+    *timeout_ms* of scanning (``cli.search_max_blocks_scanned`` and
+    ``cli.search_timeout_ms`` by default, capped by their ``_cap``
+    settings).  A search that runs out returns its results so far with
+    ``partial`` set, the exhausted limit in ``stop_reason`` and a
+    ``next_cursor`` to continue from.
+
+    Pass *fields* (comma-separated) to return only those fields of each
+    result; large ``data`` payloads are then left out unless asked for.
     """
     all_args = (tx_hash, sender, receiver, key)
     if not any(all_args):
@@ -69,6 +105,12 @@ def search_transactions(
             detail="Provide start_block_hash or start_block_height, not both",
         )
 
+    if cursor and (start_block_hash or start_block_height is not None):
+        raise HTTPException(
+            status_code=400,
+            detail="Provide cursor or a start block, not both",
+        )
+
     if end_block_hash and end_block_height != 0:
         raise HTTPException(
             status_code=400,
@@ -83,47 +125,128 @@ def search_transactions(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid hex in query parameter")
 
-    # Resolve starting height
-    resolved_start_height = start_block_height
+    selected = parse_fields(fields, SEARCH_RESULT_FIELDS)
+
+    resume = None
+    if cursor:
+        try:
+            resume = decode_search_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid search cursor")
+
+    start_hash_bytes = end_hash_bytes = None
     if start_block_hash:
         try:
-            block_hash_bytes = bytes.fromhex(start_block_hash)
+            start_hash_bytes = bytes.fromhex(start_block_hash)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid hex in start_block_hash parameter")
-        try:
-            b = get_block_from_storage(node, block_hash_bytes)
-            resolved_start_height = b.height
-        except ValueError as exc:
-            raise HTTPException(status_code=404, detail=f"Start block not found: {exc}")
-
-    # Resolve end height
-    resolved_end_height = end_block_height
     if end_block_hash:
         try:
             end_hash_bytes = bytes.fromhex(end_block_hash)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid hex in end_block_hash parameter")
+
+    content = await run_scan(
+        _search,
+        node,
+        tx_hash=tx_hash_bytes,
+        sender=sender_bytes,
+        receiver=receiver_bytes,
+        key=key_bytes,
+        start_height=start_block_height,
+        start_hash=start_hash_bytes,
+        end_height=end_block_height,
+        end_hash=end_hash_bytes,
+        limit=limit,
+        resume=resume,
+        max_blocks_scanned=_budget_setting(
+            "search_max_blocks_scanned", max_blocks_scanned, DEFAULT_MAX_BLOCKS_SCANNED,
+        ),
+        timeout_ms=_budget_setting("search_timeout_ms", timeout_ms, DEFAULT_TIMEOUT_MS),
+        fields=selected,
+    )
+    return encode_response(request, content)
+
+
+def _budget_setting(key: str, requested: Optional[int], default: int) -> int:
+    """Return the requested limit (or the configured default) capped by ``cli.<key>_cap``."""
+    value = requested if requested is not None else api_setting(key, default)
+    cap = api_setting(f"{key}_cap", None)
+    return value if cap is None else min(value, cap)
+
+
+def _search(
+    node,
+    *,
+    tx_hash: bytes,
+    sender: bytes,
+    receiver: bytes,
+    key: bytes,
+    start_height: Optional[int],
+    start_hash: Optional[bytes],
+    end_height: int,
+    end_hash: Optional[bytes],
+    limit: int,
+    resume: Optional[tuple[int, int, bytes]],
+    max_blocks_scanned: int,
+    timeout_ms: int,
+    fields: Optional[frozenset[str]] = None,
+) -> dict:
+    # The deadline starts once the scan is running, not while it is queued.
+    budget = SearchBudget(max_blocks=max_blocks_scanned, timeout=timeout_ms / 1000)
+
+    # Resolve starting block
+    start_block = node.latest_block
+    start_position = 0
+    if resume is not None:
+        resume_height, start_position, resume_hash = resume
         try:
-            b = get_block_from_storage(node, end_hash_bytes)
+            start_block = get_cached_block(node, resume_hash)
+        except ValueError as exc:
+            raise HTTPException(status_code=404, detail=f"Cursor block not found: {exc}")
+        if start_block.height != resume_height:
+            raise HTTPException(status_code=400, detail="Invalid search cursor")
+    elif start_hash:
+        try:
+            start_block = get_cached_block(node, start_hash)
+        except ValueError as exc:
+            raise HTTPException(status_code=404, detail=f"Start block not found: {exc}")
+    elif start_height is not None:
+        start_block = get_block_by_height(node, start_height)
+
+    # Resolve end height
+    resolved_end_height = end_height
+    if end_hash:
+        try:
+            b = get_cached_block(node, end_hash)
             resolved_end_height = b.height
         except ValueError as exc:
             raise HTTPException(status_code=404, detail=f"End block not found: {exc}")
 
     try:
-        results = find_transactions(
+        results, next_position = find_transactions(
             node,
-            tx_hash=tx_hash_bytes,
-            sender=sender_bytes,
-            receiver=receiver_bytes,
-            key=key_bytes,
-            start_height=resolved_start_height,
+            tx_hash=tx_hash,
+            sender=sender,
+            receiver=receiver,
+            key=key,
+            start_block=start_block,
             end_height=resolved_end_height,
             limit=limit,
+            start_position=start_position,
+            budget=budget,
         )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
+    # Chunks scanned ahead may spend the budget after the page filled up;
+    # only a short page with somewhere to resume was cut off by it.
+    stop_reason = budget.exhausted if next_position is not None and len(results) < limit else None
     return {
-        "results": [_serialize_tx(tx) for tx in results],
+        "results": [_serialize_tx(tx, fields) for tx in results],
         "count": len(results),
+        "next_cursor": None if next_position is None else encode_search_cursor(*next_position),
+        "partial": stop_reason is not None,
+        "stop_reason": stop_reason,
     }
+
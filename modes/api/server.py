@@ -1,25 +1,36 @@
 """Astreum API — FastAPI server exposing node data over HTTP.
 
 Endpoint modules live alongside this file: expr.py, list.py, chain.py,
-block.py, accounts.py, transaction.py.  This module creates the app and
-registers their routers.
+block.py, accounts.py, transaction.py, search.py, batch.py, stream.py,
+metrics.py.  This
+module creates the app and registers their routers.
 """
 
 from __future__ import annotations
 
 import logging
+from typing import Any
 
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 
+from .admission import AdmissionMiddleware, configure_admission
+from .body_cache import configure_body_cache
 from .deps import set_node as set_node     # re-exported for modes/headless.py
+from .deps import set_settings
+from .executors import configure_executors
 from .expr import router as expr_router
 from .list import router as list_router
 from .chain import router as chain_router
 from .block import router as block_router
 from .accounts import router as accounts_router
+from .transaction import configure_transaction_submission
 from .transaction import router as transaction_router
 from .search import router as search_router
+from .batch import router as batch_router
+from .stream import router as stream_router
+from .metrics import MetricsMiddleware
+from .metrics import router as metrics_router
 
 logger = logging.getLogger("astreum.api")
 
@@ -35,6 +46,10 @@ async def value_error_handler(request, exc: ValueError):
     return JSONResponse(status_code=422, content={"detail": str(exc)})
 
 
+app.add_middleware(AdmissionMiddleware)
+# Added last so it is outermost and also times requests shed by admission.
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(expr_router)
 app.include_router(list_router)
 app.include_router(chain_router)
@@ -42,3 +57,15 @@ app.include_router(block_router)
 app.include_router(accounts_router)
 app.include_router(transaction_router)
 app.include_router(search_router)
+app.include_router(batch_router)
+app.include_router(stream_router)
+app.include_router(metrics_router)
+
+
+def configure_api(cli_configs: dict[str, Any]) -> None:
+    """Apply the ``cli.api_*`` settings; call before serving requests."""
+    set_settings(cli_configs)
+    configure_executors(cli_configs)
+    configure_admission(cli_configs)
+    configure_body_cache(cli_configs)
+    configure_transaction_submission(cli_configs)
@@ -0,0 +1,78 @@
+"""Single-flight coalescing of identical concurrent lookups.
+
+A handler passes its pool call through ``SingleFlight.do`` with a key that
+captures everything the result depends on.  The first request for a key
+runs the call; requests for the same key that arrive while it is in flight
+await that same result (or exception) instead of repeating the storage
+reads and decoding — the burst every new block triggers.  Nothing is kept
+once the call finishes; completed results are the block and account
+caches' job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """In-flight calls of one route, keyed by request identity.
+
+    Only used from the event loop, so the table and counters need no lock.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()``, sharing one call among concurrent callers with the same *key*."""
+        call = self._calls.get(key)
+        if call is None:
+            self.calls += 1
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        # Shielded so a caller that goes away does not cancel the call for
+        # the others still waiting on it.
+        return await asyncio.shield(call)
+
+    def _finish(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Mark the exception retrieved even if every waiter went away.
+            call.exception()
+
+
+flights: dict[str, SingleFlight] = {}
+
+
+def single_flight(name: str) -> SingleFlight:
+    """Return the ``SingleFlight`` group for route *name*, registering it for /metrics."""
+    flight = flights.get(name)
+    if flight is None:
+        flight = flights[name] = SingleFlight(name)
+    return flight
+
+
+async def coalesce(
+    flight: SingleFlight,
+    key: Hashable,
+    run: Callable[..., Awaitable[T]],
+    fn: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """Run ``run(fn, *args, **kwargs)`` (a pool runner) through *flight* under *key*."""
+    return await flight.do(key, lambda: run(fn, *args, **kwargs))
@@ -0,0 +1,158 @@
+"""Push endpoints for new chain heads — SSE and WebSocket.
+
+A single ``HeadBroadcaster`` listens to the latest-block poller, serializes
+each new head once and fans the encoded payload out to every subscriber's
+queue.  Heads are published one at a time, in the order the poller saw
+them, so a slow serialization never lets an older head overtake a newer
+one.  Subscriber queues are small and drop their oldest entry when a
+client falls behind, since only the newest head matters.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from utils.latest_block import add_latest_block_listener
+
+from .block import _serialize_block
+from .deps import require_node
+from .encoding import encode_json
+from .executors import run_lookup
+
+logger = logging.getLogger("astreum.api")
+
+router = APIRouter()
+
+SUBSCRIBER_QUEUE_SIZE = 4
+KEEPALIVE_SECONDS = 15.0
+
+
+class HeadBroadcaster:
+    """Fan out serialized chain heads from one producer to many subscribers."""
+
+    def __init__(self) -> None:
+        self._subscribers: set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._node: Any = None
+        self._last_payload: Optional[str] = None
+        self._last_hash: Optional[bytes] = None
+        self._pending: Optional[asyncio.Queue] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, node: Any) -> asyncio.Queue:
+        """Register a subscriber queue, primed with the current head if known."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._node = node
+            self._pending = asyncio.Queue()
+            self._loop.create_task(self._run())
+            add_latest_block_listener(node, self._on_latest_block)
+            if node.latest_block is not None:
+                self._pending.put_nowait(node.latest_block)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if self._last_payload is not None:
+            queue.put_nowait(self._last_payload)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def _on_latest_block(self, block: Any) -> None:
+        # Runs on the poller thread; hop onto the event loop.
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._pending.put_nowait, block)
+
+    async def _run(self) -> None:
+        pending = self._pending
+        while True:
+            block = await pending.get()
+            # Only the newest of a backlog matters.
+            while not pending.empty():
+                block = pending.get_nowait()
+            await self._publish(self._node, block)
+
+    async def _publish(self, node: Any, block: Any) -> None:
+        if block is None or block.expr_id == self._last_hash:
+            return
+        try:
+            payload = encode_json(await run_lookup(_serialize_block, block, node)).decode()
+        except Exception as exc:
+            logger.warning("Failed to serialize head %s: %s", block.expr_id.hex()[:16], exc)
+            return
+        self._last_hash = block.expr_id
+        self._last_payload = payload
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+
+heads = HeadBroadcaster()
+
+
+async def _sse_events(queue: asyncio.Queue) -> AsyncIterator[str]:
+    try:
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: head\ndata: {payload}\n\n"
+    finally:
+        heads.unsubscribe(queue)
+
+
+@router.get("/stream/heads")
+async def stream_heads(node=Depends(require_node)):
+    """Server-Sent Events stream of the serialized latest block on each change."""
+    queue = heads.subscribe(node)
+    return StreamingResponse(
+        _sse_events(queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream/heads/ws")
+async def stream_heads_ws(websocket: WebSocket):
+    """WebSocket variant of ``/stream/heads``; each message is one block."""
+    await websocket.accept()
+    try:
+        node = await require_node()
+    except HTTPException as exc:
+        await websocket.close(code=1013, reason=str(exc.detail))
+        return
+
+    queue = heads.subscribe(node)
+    # Watch for the client going away while idle between heads; anything
+    # else it sends (pings, keepalives) is ignored.
+    received = asyncio.ensure_future(websocket.receive())
+    getter = asyncio.ensure_future(queue.get())
+    try:
+        while True:
+            done, _ = await asyncio.wait({getter, received}, return_when=asyncio.FIRST_COMPLETED)
+            if received in done:
+                if received.result()["type"] == "websocket.disconnect":
+                    break
+                received = asyncio.ensure_future(websocket.receive())
+            if getter in done:
+                await websocket.send_text(getter.result())
+                getter = asyncio.ensure_future(queue.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        received.cancel()
+        getter.cancel()
+        heads.unsubscribe(queue)
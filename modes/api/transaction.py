@@ -1,50 +1,206 @@
-"""Transaction endpoints — GET and POST."""
+"""Transaction endpoints — GET, POST and bulk POST."""
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Body
+import asyncio
+from typing import Any, Callable, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from fastapi import APIRouter, Depends, HTTPException, Body, Request
 
 from astreum import Transaction, send_transaction, parse, tokenize
 from astreum.consensus.transaction import TransactionCode
 from astreum.consensus.transaction.from_storage import get_transaction_from_storage
 from astreum.expression import NIL
 
-from .deps import require_node, hex_encode
+from utils.cache import LRUCache
+
+from . import executors
+from .body_cache import cached_response, encode_cached_response
+from .deps import (
+    api_setting,
+    check_not_modified,
+    get_primary,
+    immutable_cache_headers,
+    parse_fields,
+    require_node,
+)
+from .encoding import encode_response
+from .executors import run_lookup, run_scan
+from .singleflight import coalesce, single_flight
 
 router = APIRouter()
 
+DEFAULT_TRANSACTIONS_MAX_ITEMS = 1000
+DEFAULT_SEEN_TRANSACTIONS_MAX_ENTRIES = 65536
 
-@router.get("/transaction/{tx_id}")
-def get_transaction(tx_id: str, node=Depends(require_node)):
-    """Return a transaction by its expr hash."""
-    try:
-        tx_bytes = bytes.fromhex(tx_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid hex transaction id")
+_transaction_flight = single_flight("transaction")
+
+# Body hashes of transactions accepted by POST /transactions, for dedup.
+_seen_body_hashes = LRUCache(max_entries=DEFAULT_SEEN_TRANSACTIONS_MAX_ENTRIES)
 
+
+_TRANSACTION_FIELDS: dict[str, Callable[[Any], Any]] = {
+    "id": lambda tx: tx.expr_id or tx.hash,
+    "chain_id": lambda tx: tx.chain_id,
+    "amount": lambda tx: tx.amount,
+    "code": lambda tx: tx.code.name if hasattr(tx.code, "name") else int(tx.code),
+    "counter": lambda tx: tx.counter,
+    "cost_limit": lambda tx: tx.cost_limit,
+    "data": lambda tx: repr(tx.data),
+    "recipient": lambda tx: tx.recipient,
+    "sender": lambda tx: tx.sender,
+    "signature": lambda tx: tx.signature,
+    "body_hash": lambda tx: tx.body_hash,
+}
+TRANSACTION_FIELDS = tuple(_TRANSACTION_FIELDS)
+
+
+def _load_transaction(node, tx_bytes: bytes, *, fields: Optional[frozenset[str]] = None) -> dict:
     try:
         tx = get_transaction_from_storage(node, tx_bytes)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
+    # ``repr(tx.data)`` can be large, so only requested fields are computed.
     return {
-        "id": hex_encode(tx.expr_id or tx.hash),
-        "chain_id": tx.chain_id,
-        "amount": tx.amount,
-        "code": tx.code.name if hasattr(tx.code, "name") else int(tx.code),
-        "counter": tx.counter,
-        "cost_limit": tx.cost_limit,
-        "data": repr(tx.data),
-        "recipient": tx.recipient.hex(),
-        "sender": tx.sender.hex(),
-        "signature": hex_encode(tx.signature),
-        "body_hash": hex_encode(tx.body_hash),
+        name: get(tx)
+        for name, get in _TRANSACTION_FIELDS.items()
+        if fields is None or name in fields
     }
 
 
+@router.get("/transaction/{tx_id}")
+async def get_transaction(
+    tx_id: str,
+    request: Request,
+    fields: Optional[str] = None,
+    node=Depends(require_node),
+):
+    """Return a transaction by its expr hash (only *fields*, comma-separated, if given)."""
+    cache_headers = immutable_cache_headers(request)
+    not_modified = check_not_modified(request, cache_headers)
+    if not_modified is not None:
+        return not_modified
+    cached = cached_response(cache_headers)
+    if cached is not None:
+        return cached
+    try:
+        tx_bytes = bytes.fromhex(tx_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid hex transaction id")
+    selected = parse_fields(fields, TRANSACTION_FIELDS)
+
+    content = await coalesce(
+        _transaction_flight,
+        (tx_bytes, selected),
+        run_lookup,
+        _load_transaction,
+        node,
+        tx_bytes,
+        fields=selected,
+    )
+    return encode_cached_response(request, content, cache_headers)
+
+
 @router.post("/transaction")
-def submit_transaction(payload: dict = Body(...), node=Depends(require_node)):
+async def submit_transaction(payload: dict = Body(...), node=Depends(require_node)):
     """Accept, verify, and broadcast a pre-signed transaction to the network."""
+    primary = get_primary()
+    if primary is not None:
+        # API worker process: the primary owns the network and validation queue.
+        return await run_scan(primary.call, "transaction", payload)
+
+    tx = _parse_transaction_payload(payload)
+
+    # Broadcast off the event loop
+    return await run_scan(_broadcast_transaction, node, tx)
+
+
+@router.post("/transactions")
+async def submit_transactions(
+    request: Request, payloads: list[Any] = Body(...), node=Depends(require_node)
+):
+    """Accept an array of pre-signed transactions and return one result per item.
+
+    Items are checked (fields, body hash, signature) in chunks on the scan
+    pool; each chunk is stored and broadcast as soon as it has been checked,
+    so later chunks are verified while earlier ones are being written.
+    Transactions whose body hash was accepted recently, by this or another
+    request, are answered with 409.
+    """
+    max_items = api_setting("api_transactions_max_items", DEFAULT_TRANSACTIONS_MAX_ITEMS)
+    if len(payloads) > max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(payloads)} transactions exceeds the limit of {max_items}",
+        )
+
+    primary = get_primary()
+    if primary is not None:
+        content = await run_scan(primary.call, "transactions", payloads)
+    else:
+        content = await submit_all(node, payloads)
+    return encode_response(request, content)
+
+
+async def submit_all(node, payloads: list[Any]) -> dict:
+    """Check, dedup, store and send *payloads*; returns ``{"results": [...]}`` in order."""
+    chunk_count = max(1, executors.scan_executor.workers)
+    chunk_size = max(1, -(-len(payloads) // chunk_count))
+    indexed = list(enumerate(payloads))
+    chunks = [indexed[start:start + chunk_size] for start in range(0, len(indexed), chunk_size)]
+
+    results: list[Optional[dict]] = [None] * len(payloads)
+    await asyncio.gather(*(_submit_chunk(node, chunk, results) for chunk in chunks))
+    return {"results": results}
+
+
+async def _submit_chunk(node, chunk: list[tuple[int, Any]], results: list) -> None:
+    checked = await executors.run_scan(_check_payloads, chunk)
+
+    # Runs on the event loop, so checking and marking a body hash cannot
+    # interleave with another chunk or request.
+    accepted = []
+    for index, tx, error in checked:
+        if error is not None:
+            results[index] = {"index": index, "error": error.detail, "status": error.status_code}
+        elif tx.body_hash in _seen_body_hashes:
+            results[index] = {"index": index, "error": "Transaction already submitted", "status": 409}
+        else:
+            _seen_body_hashes.put(tx.body_hash, True)
+            accepted.append((index, tx))
+    if not accepted:
+        return
+
+    try:
+        outcomes = await executors.run_scan(_send_transactions, node, [tx for _, tx in accepted])
+    except HTTPException as exc:
+        outcomes = [exc] * len(accepted)
+    for (index, tx), outcome in zip(accepted, outcomes):
+        if isinstance(outcome, HTTPException):
+            # Not accepted after all; let the client retry it.
+            _seen_body_hashes.discard(tx.body_hash)
+            results[index] = {"index": index, "error": outcome.detail, "status": outcome.status_code}
+        else:
+            results[index] = {"index": index, "result": outcome}
+
+
+def configure_transaction_submission(cli_configs: dict[str, Any]) -> None:
+    """Apply ``cli.api_transactions_seen_max_entries`` to the recently-seen body hashes."""
+    _seen_body_hashes.resize(
+        max_entries=cli_configs.get(
+            "api_transactions_seen_max_entries", DEFAULT_SEEN_TRANSACTIONS_MAX_ENTRIES
+        ),
+    )
+
+
+def _parse_transaction_payload(payload: Any) -> Transaction:
+    """Rebuild a Transaction from a submitted JSON payload; raises 400 on bad input."""
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Transaction payload must be an object")
+
     # 1. Parse hex formats
     try:
         sender_bytes = bytes.fromhex(payload["sender"])
@@ -57,7 +213,7 @@ def submit_transaction(payload: dict = Body(...), node=Depends(require_node)):
     # 2. Parse transaction code
     try:
         code_enum = TransactionCode[payload["code"].upper()]
-    except KeyError:
+    except (KeyError, AttributeError):
         raise HTTPException(status_code=400, detail=f"Invalid transaction code: {payload.get('code')}")
 
     # 3. Parse data expression
@@ -69,7 +225,7 @@ def submit_transaction(payload: dict = Body(...), node=Depends(require_node)):
 
     # 4. Reconstruct and verify transaction
     try:
-        tx = Transaction(
+        return Transaction(
             chain_id=payload["chain_id"],
             amount=payload["amount"],
             counter=payload["counter"],
@@ -84,7 +240,67 @@ def submit_transaction(payload: dict = Body(...), node=Depends(require_node)):
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Transaction validation failed: {exc}")
 
-    # 5. Broadcast via core library send_transaction
+
+def _verify_signature(tx) -> None:
+    """Check *tx*'s body hash against its fields and its signature against the sender key."""
+    # tx.expr() is [[body, signature], transaction]; the signed hash is the body's.
+    if tx.expr().head.head.hash() != tx.body_hash:
+        raise HTTPException(status_code=400, detail="Body hash does not match transaction fields")
+    try:
+        Ed25519PublicKey.from_public_bytes(tx.sender).verify(tx.signature, tx.body_hash)
+    except (InvalidSignature, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid transaction signature")
+
+
+def _check_payloads(chunk: list[tuple[int, Any]]) -> list[tuple[int, Optional[Transaction], Optional[HTTPException]]]:
+    checked = []
+    for index, payload in chunk:
+        try:
+            tx = _parse_transaction_payload(payload)
+            _verify_signature(tx)
+        except HTTPException as exc:
+            checked.append((index, None, exc))
+        else:
+            checked.append((index, tx, None))
+    return checked
+
+
+def _send_transactions(node, txs: list) -> list:
+    """Broadcast *txs*, enqueueing locally the ones that cannot be; returns a result or HTTPException per tx."""
+    outcomes: list = [None] * len(txs)
+    local = []
+    broadcast = node.is_connected
+    for position, tx in enumerate(txs):
+        if broadcast:
+            try:
+                tx_hash = send_transaction(node, tx)
+            except Exception:
+                # Without a validator route every send waits out the route
+                # request; enqueue the rest of the chunk locally instead.
+                broadcast = False
+            else:
+                outcomes[position] = {
+                    "success": True,
+                    "tx_hash": tx_hash.hex() if isinstance(tx_hash, bytes) else str(tx_hash),
+                    "message": "Transaction validated and broadcasted successfully.",
+                }
+                continue
+        local.append(position)
+
+    for position, error in zip(local, _enqueue_all_locally(node, [txs[position] for position in local])):
+        if error is None:
+            outcomes[position] = {
+                "success": True,
+                "tx_hash": txs[position].hash.hex(),
+                "message": "Transaction validated and enqueued locally (no external validator route).",
+            }
+        else:
+            outcomes[position] = HTTPException(status_code=500, detail=f"Local enqueue failed: {error}")
+    return outcomes
+
+
+def _broadcast_transaction(node, tx) -> dict:
+    """Broadcast via core library send_transaction, else enqueue locally."""
     try:
         tx_hash = send_transaction(node, tx)
         return {
@@ -126,3 +342,36 @@ def _enqueue_locally(node, tx) -> None:
 
     tx.hash = tx.expr().hash()
     node._validation_transaction_queue.put(tx)
+
+
+def _enqueue_all_locally(node, txs: list) -> list[Optional[str]]:
+    """Persist many transactions and submit them to the local validation queue.
+
+    Each transaction tree is written once from its root (the storage puts
+    recurse into children) rather than once per inner expr.  Returns an
+    error message per transaction, or None if it was enqueued.
+    """
+    from astreum.expression import resolve_inner_exprs
+    from astreum.storage.put.hot import put_expr_in_hot_storage
+    from astreum.storage.put.cold import put_expr_in_cold_storage
+
+    errors: list[Optional[str]] = []
+    stored = []
+    for tx in txs:
+        _, missed = resolve_inner_exprs(node, tx.expr())
+        if missed:
+            errors.append("transaction data unavailable locally")
+            continue
+        try:
+            put_expr_in_hot_storage(node, tx.expr())
+            put_expr_in_cold_storage(node, tx.expr())
+        except Exception as exc:
+            errors.append(str(exc))
+            continue
+        errors.append(None)
+        stored.append(tx)
+
+    for tx in stored:
+        tx.hash = tx.expr().hash()
+        node._validation_transaction_queue.put(tx)
+    return errors
@@ -0,0 +1,378 @@
+"""Multi-process API workers serving reads from the node's cold storage.
+
+With ``cli.api_workers`` > 0, headless mode binds the API socket once and
+starts that many worker processes that accept on it, each with its own
+read-only ``Node`` over the node's cold storage, so reads no longer share
+the node process's GIL with networking and validation.
+
+The node (primary) process publishes its tip through a small shared-memory
+segment: the latest block hash, the height index length and the exported
+fork state, guarded by a sequence counter.  Workers poll it and follow.
+Writes (``POST /transaction`` and ``/transactions``) are forwarded to the
+primary over a local ``multiprocessing.connection`` channel and handled
+there exactly as in single-process mode.
+
+Exprs that only exist in the primary's hot storage are not visible to
+workers; a tip they cannot decode yet is retried on the next poll.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import secrets
+import struct
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import uvicorn
+from fastapi import HTTPException
+
+from astreum.consensus.fork.node import export_forks, import_forks
+from astreum.expression import ZERO32
+
+from utils.latest_block import (
+    _notify_latest_block_listeners,
+    add_height_index_listener,
+    add_latest_block_listener,
+    remove_height_index_listener,
+    remove_latest_block_listener,
+)
+
+logger = logging.getLogger("astreum.api")
+
+DEFAULT_TIP_SEGMENT_BYTES = 64 * 1024
+DEFAULT_TIP_POLL_INTERVAL = 0.25
+
+_NODE_KEY_PREFIXES = ("validation_", "storage_secret_", "storage_public_")
+
+# seq, height index length, latest block hash, fork payload length
+_HEADER = struct.Struct(">QQ32sI")
+
+
+class TipSegment:
+    """Shared-memory tip published by the primary and read by the workers.
+
+    One writer; readers retry while the sequence number is odd (a write in
+    progress) or changes under them.
+    """
+
+    def __init__(self, shm: SharedMemory, *, owner: bool) -> None:
+        self._shm = shm
+        self._owner = owner
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, size: int = DEFAULT_TIP_SEGMENT_BYTES) -> "TipSegment":
+        shm = SharedMemory(create=True, size=max(size, _HEADER.size))
+        shm.buf[:_HEADER.size] = bytes(_HEADER.size)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "TipSegment":
+        # Spawned workers share the primary's resource tracker, so attaching
+        # does not hand the segment's lifetime to them.
+        return cls(SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def publish(self, latest_hash: Optional[bytes], index_length: int, forks: bytes) -> None:
+        """Publish a new tip; fork state that does not fit is left out."""
+        buf = self._shm.buf
+        if _HEADER.size + len(forks) > len(buf):
+            logger.warning("Fork state (%s bytes) exceeds the tip segment; not shared", len(forks))
+            forks = b""
+        with self._lock:
+            seq = _HEADER.unpack_from(buf)[0]
+            struct.pack_into(">Q", buf, 0, seq + 1)
+            _HEADER.pack_into(buf, 0, seq + 1, index_length, latest_hash or ZERO32, len(forks))
+            buf[_HEADER.size:_HEADER.size + len(forks)] = forks
+            struct.pack_into(">Q", buf, 0, seq + 2)
+
+    def read(self) -> tuple[int, Optional[bytes], int, bytes]:
+        """Return ``(seq, latest_hash, index_length, forks)`` from a consistent snapshot."""
+        buf = self._shm.buf
+        while True:
+            seq, index_length, latest_hash, forks_length = _HEADER.unpack_from(buf)
+            if seq % 2 == 0:
+                forks = bytes(buf[_HEADER.size:_HEADER.size + forks_length])
+                if struct.unpack_from(">Q", buf)[0] == seq:
+                    return seq, (None if latest_hash == ZERO32 else latest_hash), index_length, forks
+            time.sleep(0)
+
+    def close(self) -> None:
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def _publish_tip(node: Any, segment: TipSegment) -> None:
+    height_index = getattr(node, "height_index", None)
+    segment.publish(
+        node.latest_block_hash,
+        len(height_index) if height_index is not None else 0,
+        export_forks(node) if hasattr(node, "forks") else b"",
+    )
+
+
+class PrimaryServer:
+    """Serves writes forwarded by the workers, on the primary's node."""
+
+    def __init__(self, node: Any) -> None:
+        self.node = node
+        self.authkey = secrets.token_bytes(32)
+        self._listener = Listener(authkey=self.authkey)
+        self._thread = threading.Thread(target=self._accept, name="astreum-api-primary", daemon=True)
+        self._thread.start()
+
+    @property
+    def address(self) -> Any:
+        return self._listener.address
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return  # listener closed
+            except Exception as exc:
+                logger.debug("Rejected worker connection: %s", exc)
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    op, payload = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ("ok", self._handle(op, payload))
+                except HTTPException as exc:
+                    reply = ("error", exc.status_code, exc.detail)
+                except Exception as exc:
+                    reply = ("error", 500, str(exc))
+                try:
+                    conn.send(reply)
+                except (EOFError, OSError):
+                    return
+
+    def _handle(self, op: str, payload: Any) -> Any:
+        from .transaction import _broadcast_transaction, _parse_transaction_payload, submit_all
+
+        if op == "transaction":
+            return _broadcast_transaction(self.node, _parse_transaction_payload(payload))
+        if op == "transactions":
+            return asyncio.run(submit_all(self.node, payload))
+        raise HTTPException(status_code=400, detail=f"Unknown forwarded operation: {op}")
+
+    def close(self) -> None:
+        self._listener.close()
+
+
+class PrimaryClient:
+    """Worker-side channel to ``PrimaryServer``; keeps a connection per concurrent caller."""
+
+    def __init__(self, address: Any, authkey: bytes) -> None:
+        self.address = address
+        self.authkey = authkey
+        self._idle: "queue.SimpleQueue[Connection]" = queue.SimpleQueue()
+
+    def call(self, op: str, payload: Any) -> Any:
+        """Run *op* on the primary and return its result; errors come back as HTTPException."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+        try:
+            if conn is None:
+                conn = Client(self.address, authkey=self.authkey)
+            conn.send((op, payload))
+            reply = conn.recv()
+        except (EOFError, OSError) as exc:
+            if conn is not None:
+                conn.close()
+            raise HTTPException(status_code=503, detail=f"Primary process unavailable: {exc}")
+        self._idle.put(conn)
+        if reply[0] == "ok":
+            return reply[1]
+        raise HTTPException(status_code=reply[1], detail=reply[2])
+
+
+def _follow_tip(node: Any, segment: TipSegment, interval: float, stop: threading.Event) -> None:
+    from utils.block_cache import get_cached_block
+
+    applied = 0
+    while not stop.wait(interval):
+        tx_index = getattr(node, "tx_index", None)
+        if tx_index is not None:
+            # The primary's index worker adds blocks between tips.
+            tx_index.reload()
+        seq, latest_hash, index_length, forks = segment.read()
+        if seq == applied:
+            continue
+        height_index = getattr(node, "height_index", None)
+        if height_index is not None:
+            height_index.follow(index_length)
+        with node.forks_lock:
+            node.forks.clear()
+        if forks:
+            import_forks(node, forks)
+        if latest_hash is None:
+            applied = seq
+            continue
+        try:
+            block = get_cached_block(node, latest_hash)
+        except Exception:
+            # Not in cold storage yet; retry on the next poll.
+            node._block_fetch_attempts = getattr(node, "_block_fetch_attempts", 0) + 1
+            continue
+        with node.latest_block_lock:
+            changed = node.latest_block_hash != latest_hash
+            node.latest_block_hash = latest_hash
+        node.latest_block = block
+        applied = seq
+        # Republishes for height index growth alone keep the same head.
+        if changed:
+            _notify_latest_block_listeners(node, block)
+
+
+def _worker_main(
+    sock: Any,
+    *,
+    cli_configs: dict[str, Any],
+    node_configs: dict[str, Any],
+    data_dir: Path,
+    segment_name: str,
+    primary_address: Any,
+    primary_authkey: bytes,
+) -> None:
+    from astreum import Node
+    from astreum.consensus.fork.node import fork_setup
+
+    from utils.account_cache import configure_account_caches
+    from utils.block_cache import configure_block_cache
+    from utils.block_rate import configure_block_rate_cache
+    from utils.expr_cache import configure_expr_cache
+    from utils.height_index import HeightIndex
+    from utils.tx_index import TxIndex
+    from utils.tx_search import configure_search_workers
+
+    from .deps import set_node, set_primary
+    from .server import app, configure_api
+
+    configure_block_cache(cli_configs)
+    configure_block_rate_cache(cli_configs)
+    configure_account_caches(cli_configs)
+    configure_expr_cache(cli_configs)
+    configure_search_workers(cli_configs)
+
+    node = Node(config=node_configs)
+    fork_setup(node)
+    node.height_index = HeightIndex.open(data_dir)
+    if cli_configs.get("tx_index_enabled"):
+        node.tx_index = TxIndex.open(data_dir)
+    set_node(node)
+    set_primary(PrimaryClient(primary_address, primary_authkey))
+    configure_api(cli_configs)
+
+    segment = TipSegment.attach(segment_name)
+    stop = threading.Event()
+    threading.Thread(
+        target=_follow_tip,
+        args=(node, segment, cli_configs.get("api_workers_poll_interval", DEFAULT_TIP_POLL_INTERVAL), stop),
+        name="astreum-api-tip",
+        daemon=True,
+    ).start()
+
+    config = uvicorn.Config(
+        app,
+        log_level="warning",
+        limit_concurrency=cli_configs.get("api_max_connections"),
+    )
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+    finally:
+        stop.set()
+        segment.close()
+
+
+def start_api_workers(
+    *,
+    node: Any,
+    configs: dict[str, Any],
+    data_dir: Path,
+    host: str,
+    port: int,
+    workers: int,
+) -> Callable[[], None]:
+    """
+    Bind the API socket and start *workers* API processes serving it.
+
+    The tip is republished whenever the poller decodes a new latest block
+    or a poller pass changes the height index length.
+    Returns a callable that stops the workers and releases the segment.
+    """
+    cli_configs = configs["cli"]
+    segment = TipSegment.create(cli_configs.get("api_workers_segment_bytes", DEFAULT_TIP_SEGMENT_BYTES))
+    _publish_tip(node, segment)
+
+    def _on_latest_block(_block: Any) -> None:
+        _publish_tip(node, segment)
+
+    def _on_height_index(_length: int) -> None:
+        _publish_tip(node, segment)
+
+    add_latest_block_listener(node, _on_latest_block)
+    add_height_index_listener(node, _on_height_index)
+    server = PrimaryServer(node)
+
+    sock = uvicorn.Config("modes.api.server:app", host=host, port=port, log_level="warning").bind_socket()
+    # Workers never validate or connect; they only read cold storage.  The
+    # node fills its keys into this dict, and each worker makes its own.
+    node_configs = {
+        key: value
+        for key, value in configs["node"].items()
+        if key != "latest_block_hash" and not key.startswith(_NODE_KEY_PREFIXES)
+    }
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for index in range(workers):
+        process = context.Process(
+            target=_worker_main,
+            args=(sock,),
+            kwargs={
+                "cli_configs": cli_configs,
+                "node_configs": node_configs,
+                "data_dir": data_dir,
+                "segment_name": segment.name,
+                "primary_address": server.address,
+                "primary_authkey": server.authkey,
+            },
+            name=f"astreum-api-{index}",
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+
+    def _stop() -> None:
+        remove_latest_block_listener(node, _on_latest_block)
+        remove_height_index_listener(node, _on_height_index)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=5)
+        server.close()
+        sock.close()
+        segment.close()
+
+    return _stop
@@ -12,7 +12,10 @@ from astreum import Node, validate_blockchain, verify_blockchain
 from astreum.communication.node import connect_node
 from utils.config import persist_node_latest_block_hash, load_validator_private_key
 from utils.forks import load_node_forks, persist_node_forks
+from utils.block_rate import precompute_tip_rates
 from utils.latest_block import start_latest_block_hash_poller
+from utils.bloom_matrix import start_bloom_matrix_worker
+from utils.tx_index import start_tx_index_worker
 
 
 def run_headless(
@@ -39,6 +42,9 @@ def run_headless(
 
     wait_for_disconnect = False
     stop_latest_block_hash_poller_fn = None
+    stop_tx_index_worker_fn = None
+    stop_bloom_matrix_worker_fn = None
+    stop_api_workers_fn = None
     try:
         if should_connect:
             sys.stdout.write("connecting node...\n")
@@ -86,35 +92,77 @@ def run_headless(
             node=node,
             data_dir=data_dir,
             poll_interval=poll_interval,
+            height_index_sync_steps=configs["cli"]["height_index_sync_steps"],
         )
+        if configs["cli"]["tx_index_enabled"]:
+            stop_tx_index_worker_fn = start_tx_index_worker(
+                node=node,
+                data_dir=data_dir,
+                sync_steps=configs["cli"]["tx_index_sync_steps"],
+                idle_interval=poll_interval,
+            )
+        if configs["cli"]["bloom_matrix_enabled"]:
+            stop_bloom_matrix_worker_fn = start_bloom_matrix_worker(
+                node=node,
+                data_dir=data_dir,
+                mmap=configs["cli"]["bloom_matrix_mmap"],
+                sync_steps=configs["cli"]["bloom_matrix_sync_steps"],
+                idle_interval=poll_interval,
+            )
 
         # --- Start API server (if requested) ---
         if serve_api:
-            from modes.api.server import set_node, app
+            from modes.api.server import configure_api, set_node, app
 
             # Use config host as fallback if CLI flag wasn't given
             api_host = api_host or configs["cli"].get("api_host", "127.0.0.1")
             set_node(node)
+            configure_api(configs["cli"])
+            if configs["cli"]["block_rate_precompute"]:
+                precompute_tip_rates(node)
 
-            sys.stdout.write(f"starting API server on {api_host}:{api_port}\n")
-            sys.stdout.flush()
+            api_workers = configs["cli"].get("api_workers", 0)
+            if api_workers > 0:
+                from modes.api.workers import start_api_workers
 
-            server_thread = threading.Thread(
-                target=uvicorn.run,
-                kwargs={
-                    "app": app,
-                    "host": api_host,
-                    "port": api_port,
-                    "log_level": "warning",
-                },
-                daemon=True,
-                name="astreum-api",
-            )
-            server_thread.start()
+                sys.stdout.write(f"starting {api_workers} API worker processes on {api_host}:{api_port}\n")
+                sys.stdout.flush()
+                stop_api_workers_fn = start_api_workers(
+                    node=node,
+                    configs=configs,
+                    data_dir=data_dir,
+                    host=api_host,
+                    port=api_port,
+                    workers=api_workers,
+                )
+            else:
+                sys.stdout.write(f"starting API server on {api_host}:{api_port}\n")
+                sys.stdout.flush()
+
+                server_thread = threading.Thread(
+                    target=uvicorn.run,
+                    kwargs={
+                        "app": app,
+                        "host": api_host,
+                        "port": api_port,
+                        "log_level": "warning",
+                        # Beyond this many open connections uvicorn answers 503 itself.
+                        "limit_concurrency": configs["cli"].get("api_max_connections"),
+                    },
+                    daemon=True,
+                    name="astreum-api",
+                )
+                server_thread.start()
 
     finally:
         if wait_for_disconnect:
             _wait_until_node_disconnects(node)
+        if stop_api_workers_fn is not None:
+            stop_api_workers_fn()
+        if stop_tx_index_worker_fn is not None:
+            stop_tx_index_worker_fn()
+        if stop_bloom_matrix_worker_fn is not None:
+            stop_bloom_matrix_worker_fn()
         if stop_latest_block_hash_poller_fn is not None:
             stop_latest_block_hash_poller_fn()
         latest_hash = node.latest_block_hash
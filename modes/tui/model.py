@@ -6,6 +6,8 @@ from typing import Any, List, Optional, Tuple
 
 from utils.config import persist_node_latest_block_hash, load_validator_private_key
 from utils.latest_block import start_latest_block_hash_poller
+from utils.bloom_matrix import start_bloom_matrix_worker
+from utils.tx_index import start_tx_index_worker
 from astreum import Node, validate_blockchain, verify_blockchain
 from astreum.communication.node import connect_node
 from modes.tui.render import render_app
@@ -57,7 +59,25 @@ class App:
             node=self.node,
             data_dir=self.data_dir,
             poll_interval=poll_interval,
+            height_index_sync_steps=self.configs["cli"]["height_index_sync_steps"],
         )
+        self.stop_tx_index_worker = None
+        if self.configs["cli"]["tx_index_enabled"]:
+            self.stop_tx_index_worker = start_tx_index_worker(
+                node=self.node,
+                data_dir=self.data_dir,
+                sync_steps=self.configs["cli"]["tx_index_sync_steps"],
+                idle_interval=poll_interval,
+            )
+        self.stop_bloom_matrix_worker = None
+        if self.configs["cli"]["bloom_matrix_enabled"]:
+            self.stop_bloom_matrix_worker = start_bloom_matrix_worker(
+                node=self.node,
+                data_dir=self.data_dir,
+                mmap=self.configs["cli"]["bloom_matrix_mmap"],
+                sync_steps=self.configs["cli"]["bloom_matrix_sync_steps"],
+                idle_interval=poll_interval,
+            )
         
         self.header_block = HEADER_LINES
         self.pages = {
@@ -309,6 +329,10 @@ def run_tui(*, data_dir: Path, configs: dict[str, Any], node: Node) -> int:
     except KeyboardInterrupt:
         pass
     finally:
+        if getattr(app, "stop_tx_index_worker", None) is not None:
+            app.stop_tx_index_worker()
+        if getattr(app, "stop_bloom_matrix_worker", None) is not None:
+            app.stop_bloom_matrix_worker()
         if hasattr(app, "stop_latest_block_poller"):
             app.stop_latest_block_poller()
         latest_hash = app.node.latest_block_hash
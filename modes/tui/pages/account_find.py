@@ -4,9 +4,11 @@ from ..base import BasePage
 from ..element import PageElement
 
 from astreum.consensus.block.encoding.decode import get_block_from_storage
-from astreum.consensus.models.accounts import Accounts
 from astreum.expression import ZERO32
 
+from utils.account_cache import get_cached_account, open_accounts
+from utils.height_index import get_block_by_height
+
 
 class AccountSearchPage(BasePage):
     def __init__(self):
@@ -87,13 +89,13 @@ class AccountSearchPage(BasePage):
                 except ValueError:
                     app.flash_message = "Invalid block height after #."
                     return
-                cur = app.node.latest_block
-                while cur is not None and cur.height > target_height:
-                    cur = cur.previous_block
-                if cur is None or cur.height != target_height:
+                try:
+                    block = get_block_by_height(app.node, target_height)
+                except ValueError:
+                    block = None
+                if block is None or block.height != target_height:
                     app.flash_message = f"Block at height #{target_height} not found."
                     return
-                block = cur
             elif block_str.startswith("0x"):
                 # Resolve by hash
                 try:
@@ -123,9 +125,9 @@ class AccountSearchPage(BasePage):
             self.elements = []
             return
 
-        accounts = Accounts(root_hash=block.accounts_hash)
+        accounts = open_accounts(block.accounts_hash)
         try:
-            account = accounts.get_account(address_bytes, app.node)
+            account = get_cached_account(app.node, accounts, address_bytes)
         except Exception as exc:
             app.flash_message = f"Failed to load account: {exc}"
             return
@@ -4,9 +4,10 @@ from ..base import BasePage
 from ..element import PageElement
 
 from astreum.consensus.block.encoding.decode import get_block_from_storage
-from astreum.crypto.bloom_search.block_search import find_block_by_height
 from astreum.expression import ZERO32
 
+from utils.height_index import get_block_by_height
+
 
 class BlockSearchPage(BasePage):
     def __init__(self):
@@ -105,16 +106,11 @@ class BlockSearchPage(BasePage):
             else:
                 # Look up by height
                 target = int(height_str.removeprefix("#"))
-                start = app.node.latest_block
-                if start is None:
+                if app.node.latest_block is None:
                     self._results_body = "Node has no blocks yet."
                     self.elements = []
                     return
-                block = find_block_by_height(
-                    app.node,
-                    starting_block=start,
-                    target_height=target,
-                )
+                block = get_block_by_height(app.node, target)
         except ValueError as exc:
             app.flash_message = f"Invalid input: {exc}"
             return
@@ -6,7 +6,8 @@ from ..base import BasePage
 from ..element import PageElement
 
 from astreum.consensus.transaction.from_storage import get_transaction_from_storage
-from astreum.crypto.bloom_search import bloom_search_tx
+
+from utils.tx_search import find_transactions
 
 
 class TransactionSearchPage(BasePage):
@@ -139,14 +140,14 @@ class TransactionSearchPage(BasePage):
             return
 
         try:
-            results = bloom_search_tx(
-                astreum_node=app.node,
+            results, _ = find_transactions(
+                app.node,
                 tx_hash=tx_hash_bytes,
                 sender=sender_bytes,
                 receiver=recipient_bytes,
                 key=b"",
-                starting_block=starting_block,
-                end_block_height=0,
+                start_block=starting_block,
+                end_height=0,
                 limit=20,
             )
         except Exception as exc:
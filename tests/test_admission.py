@@ -0,0 +1,80 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from modes.api.admission import (
+    AdmissionGate,
+    TokenBucket,
+    _build_trusted_proxies,
+    client_address,
+    route_class,
+)
+
+
+class TestRouteClass(unittest.TestCase):
+    def test_classes(self):
+        self.assertEqual(route_class("GET", "/expr/ab"), "lookup")
+        self.assertEqual(route_class("GET", "/expr/ab/tree"), "scan")
+        self.assertEqual(route_class("GET", "/block/ab"), "lookup")
+        self.assertEqual(route_class("GET", "/block/ab/account/cd"), "scan")
+        self.assertEqual(route_class("GET", "/search"), "scan")
+        self.assertEqual(route_class("POST", "/batch/blocks"), "scan")
+        self.assertEqual(route_class("POST", "/transactions"), "submit")
+        self.assertEqual(route_class("GET", "/transaction/ab"), "lookup")
+        self.assertEqual(route_class("GET", "/stream/heads"), "stream")
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2.0, burst=3, now=0.0)
+        self.assertEqual([bucket.take(0.0) for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.take(0.0), 0.5)
+        self.assertEqual(bucket.take(0.5), 0.0)
+        # Refill never exceeds the burst.
+        bucket.take(100.0)
+        self.assertAlmostEqual(bucket.tokens, 2.0)
+
+
+class TestClientAddress(unittest.TestCase):
+    def _scope(self, peer, forwarded=None):
+        headers = [] if forwarded is None else [(b"x-forwarded-for", forwarded.encode())]
+        return {"client": (peer, 1234), "headers": headers}
+
+    def test_forwarded_for_only_from_trusted_proxies(self):
+        proxies = _build_trusted_proxies({"api_trusted_proxies": ["10.0.0.0/8", "192.0.2.1"]})
+        scope = self._scope("10.1.2.3", "198.51.100.7, 192.0.2.1")
+        self.assertEqual(client_address(scope, proxies), "198.51.100.7")
+        # A client cannot pick its bucket by prepending entries.
+        scope = self._scope("10.1.2.3", "203.0.113.9, 198.51.100.7")
+        self.assertEqual(client_address(scope, proxies), "198.51.100.7")
+        self.assertEqual(client_address(self._scope("10.1.2.3"), proxies), "10.1.2.3")
+        # Untrusted peers, or no trusted proxies configured, use the peer.
+        scope = self._scope("198.51.100.7", "203.0.113.9")
+        self.assertEqual(client_address(scope, proxies), "198.51.100.7")
+        scope = self._scope("10.1.2.3", "198.51.100.7")
+        self.assertEqual(client_address(scope), "10.1.2.3")
+
+
+class TestAdmissionGate(unittest.TestCase):
+    def test_sheds_past_queue_limit(self):
+        async def _run():
+            gate = AdmissionGate("scan", concurrency=1, queue_limit=1)
+            self.assertTrue(await gate.acquire())
+            queued = asyncio.ensure_future(gate.acquire())
+            await asyncio.sleep(0)
+            rejected = await gate.acquire()
+            gate.release()
+            admitted = await queued
+            gate.release()
+            return [rejected, admitted, gate.active, gate.rejected]
+
+        self.assertEqual(asyncio.run(_run()), [False, True, 0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
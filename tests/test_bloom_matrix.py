@@ -0,0 +1,187 @@
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from astreum.crypto.bloom_filter import BloomFilter, bloom_insert, bloom_test
+from astreum.crypto.bloom_search.variants import make_search_variants
+from astreum.crypto.bloom_tree.tree import BloomTree
+from astreum.expression import Expr
+
+from utils import bloom_matrix as bloom_matrix_module
+from utils.bloom_matrix import BloomMatrix, sync_bloom_matrix
+
+
+def _filters(count: int) -> tuple[list, list]:
+    rng = random.Random(7)
+    filters, elements = [], []
+    for _ in range(count):
+        bf = BloomFilter()
+        items = [rng.randbytes(128) for _ in range(rng.choice([0, 1, 5, 40]))]
+        for item in items:
+            bloom_insert(bf, item)
+        filters.append(bf)
+        elements.append(items)
+    return filters, elements
+
+
+def _block_hash(height: int) -> bytes:
+    return (height + 1).to_bytes(32, "big")
+
+
+class TestBloomMatrix(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+        self.filters, self.elements = _filters(1500)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _fill(self, matrix: BloomMatrix) -> None:
+        for height, bf in enumerate(self.filters):
+            matrix.add_block(height, _block_hash(height), [bytes(tier) for tier in bf.tiers])
+
+    def test_candidates_match_bloom_test(self):
+        matrix = BloomMatrix()
+        self._fill(matrix)
+        self.assertTrue(matrix.covers(0, 1499))
+        queries = [items[0] for items in self.elements if items][:20]
+        queries.append(b"\x00" * 128)
+        for element in queries:
+            expected = [
+                (height, _block_hash(height))
+                for height in range(1200, 99, -1)
+                if bloom_test(self.filters[height], element)
+            ]
+            self.assertEqual(list(matrix.candidates(element, high=1200, low=100)), expected)
+
+    def test_truncate_and_reopen(self):
+        matrix = BloomMatrix(self.directory)
+        self._fill(matrix)
+        matrix.truncate(1000)
+        self.assertEqual((matrix.floor, matrix.top), (0, 999))
+        element = next(items[0] for items in self.elements[1000:] if items)
+        self.assertTrue(all(height < 1000 for height, _ in matrix.candidates(element, high=1499)))
+        matrix.close()
+
+        reopened = BloomMatrix(self.directory)
+        self.assertEqual((reopened.floor, reopened.top), (0, 999))
+        self.assertEqual(reopened.block_hash(999), _block_hash(999))
+        self.assertIsNone(reopened.block_hash(1000))
+        reopened.close()
+
+
+def _store_shallow(expr, store: dict):
+    """Store *expr* the way cold storage returns it: links carry only child hashes."""
+    if expr is None:
+        return None
+    expr_hash = expr.hash()
+    if expr.base == "link":
+        head_hash = _store_shallow(expr.head, store) if expr.head is not None else expr.head_hash
+        tail_hash = _store_shallow(expr.tail, store) if expr.tail is not None else expr.tail_hash
+        store[expr_hash] = Expr("link", head_hash=head_hash, tail_hash=tail_hash)
+    else:
+        store[expr_hash] = expr
+    return expr_hash
+
+
+def _leaf(tree: BloomTree, offset: int):
+    bloom_node, low, high = tree.root, 0, 1024
+    while not bloom_node.is_leaf:
+        middle = (low + high) // 2
+        if offset < middle:
+            bloom_node, high = bloom_node.left, middle
+        else:
+            bloom_node, low = bloom_node.right, middle
+    return bloom_node
+
+
+class _FakeHeightIndex:
+    def __init__(self, hashes: list) -> None:
+        self._hashes = hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def get(self, height: int):
+        return self._hashes[height] if 0 <= height < len(self._hashes) else None
+
+
+class TestBlockLeafTiers(unittest.TestCase):
+    OFFSETS = (3, 500, 900)
+
+    def setUp(self):
+        self.tree = BloomTree()
+        self.senders = {}
+        for offset in self.OFFSETS:
+            sender = bytes([offset % 251 + 1]) * 32
+            self.tree.insert(offset, make_search_variants(b"", sender, b""))
+            self.senders[offset] = sender
+        # Serialize the final tree; cached node exprs may predate later inserts.
+        self.store: dict = {}
+        pending = [self.tree.root]
+        while pending:
+            bloom_node = pending.pop()
+            _store_shallow(bloom_node.to_expr(), self.store)
+            pending.extend(child for child in (bloom_node.left, bloom_node.right) if child is not None)
+        self.root_hash = self.tree.root.to_expr().hash()
+        self.loaded = []
+
+        def _get_expr(node, expr_id):
+            self.loaded.append(expr_id)
+            return self.store.get(expr_id)
+
+        patch = mock.patch.object(bloom_matrix_module, "get_expr", _get_expr)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def _block(self, height: int) -> SimpleNamespace:
+        return SimpleNamespace(height=height, bloom_hash=self.root_hash)
+
+    def test_each_block_gets_its_own_leaf(self):
+        for offset in self.OFFSETS:
+            tiers = bloom_matrix_module._block_leaf_tiers(None, self._block(offset))
+            self.assertEqual(tiers, [bytes(tier) for tier in _leaf(self.tree, offset).filter.tiers])
+            self.assertNotEqual(tiers, [bytes(tier) for tier in self.tree.root.filter.tiers])
+        self.assertEqual(bloom_matrix_module._block_leaf_tiers(None, self._block(4)), [])
+
+        # One path down, not the whole era's tree.
+        self.loaded.clear()
+        bloom_matrix_module._block_leaf_tiers(None, self._block(500))
+        self.assertIn(_leaf(self.tree, 500).to_expr().hash(), self.loaded)
+        for offset in (3, 900):
+            self.assertNotIn(_leaf(self.tree, offset).to_expr().hash(), self.loaded)
+
+    def test_sync_then_candidates_returns_only_matching_heights(self):
+        hashes = [_block_hash(height) for height in range(901)]
+        heights = {block_hash: height for height, block_hash in enumerate(hashes)}
+        matrix = BloomMatrix()
+        with mock.patch.object(
+            bloom_matrix_module,
+            "get_block_from_storage",
+            lambda node, block_hash: self._block(heights[block_hash]),
+        ):
+            indexed = sync_bloom_matrix(None, matrix, _FakeHeightIndex(hashes), max_blocks=1000)
+        self.assertEqual(indexed, 901)
+        for offset, sender in self.senders.items():
+            element = make_search_variants(b"", sender, b"")[1]
+            expected = [
+                (height, _block_hash(height))
+                for height in self.OFFSETS[::-1]
+                if bloom_test(_leaf(self.tree, height).filter, element)
+            ]
+            self.assertIn((offset, _block_hash(offset)), expected)
+            self.assertEqual(list(matrix.candidates(element, high=900)), expected)
+            self.assertLess(len(expected), len(self.OFFSETS))
+
+
+if __name__ == "__main__":
+    unittest.main()
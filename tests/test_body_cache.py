@@ -0,0 +1,70 @@
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from modes.api.body_cache import body_cache, cached_response, encode_cached_response
+from modes.api.deps import check_not_modified, immutable_cache_headers
+
+
+class TestBodyCache(unittest.TestCase):
+    def setUp(self):
+        body_cache.clear()
+        self.addCleanup(body_cache.clear)
+        self.loads = []
+        app = FastAPI()
+
+        # Same shape as the content-addressed routes.
+        @app.get("/thing/{thing_id}")
+        async def get_thing(thing_id: str, request: Request, complete: bool = True):
+            cache_headers = immutable_cache_headers(request)
+            not_modified = check_not_modified(request, cache_headers)
+            if not_modified is not None:
+                return not_modified
+            cached = cached_response(cache_headers)
+            if cached is not None:
+                return cached
+            self.loads.append(thing_id)
+            content = {"id": bytes.fromhex(thing_id), "complete": complete}
+            return encode_cached_response(request, content, cache_headers, complete=complete)
+
+        self.client = TestClient(app)
+
+    def test_entries_are_keyed_per_media_type(self):
+        as_json = self.client.get("/thing/ab")
+        as_cbor = self.client.get("/thing/ab", headers={"Accept": "application/cbor"})
+        self.assertNotEqual(as_json.headers["etag"], as_cbor.headers["etag"])
+        self.assertEqual(len(body_cache), 2)
+
+        again = self.client.get("/thing/AB", headers={"Accept": "application/cbor"})
+        self.assertEqual(self.loads, ["ab", "ab"])
+        self.assertEqual(again.headers["content-type"], "application/cbor")
+        self.assertEqual(again.content, as_cbor.content)
+        self.assertEqual(again.headers["etag"], as_cbor.headers["etag"])
+        self.assertEqual(self.client.get("/thing/ab").json(), {"id": "ab", "complete": True})
+
+    def test_cached_entry_answers_if_none_match_with_304(self):
+        etag = self.client.get("/thing/ab").headers["etag"]
+        response = self.client.get("/thing/ab", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["etag"], etag)
+        self.assertEqual(self.loads, ["ab"])
+
+    def test_incomplete_bodies_are_not_cached(self):
+        for _ in range(2):
+            response = self.client.get("/thing/ab?complete=false")
+            self.assertEqual(response.headers["cache-control"], "no-cache")
+            self.assertNotIn("etag", response.headers)
+        self.assertEqual(self.loads, ["ab", "ab"])
+        self.assertEqual(len(body_cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
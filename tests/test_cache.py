@@ -0,0 +1,154 @@
+import gc
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from astreum.expression import Expr
+
+from utils.account_cache import account_cache, get_cached_account
+from utils.block_cache import BlockCache
+from utils.cache import LRUCache
+from utils import expr_cache as expr_cache_module
+from utils.expr_cache import expr_cache, get_cached_expr
+
+
+class _FakeBlock:
+    def __init__(self, expr_id: bytes) -> None:
+        self.expr_id = expr_id
+        self.previous_block = None
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(
+            cache.stats(),
+            {"entries": 2, "bytes": 2, "hits": 3, "misses": 1, "evictions": 1},
+        )
+
+    def test_byte_budget(self):
+        cache = LRUCache(max_entries=10, max_bytes=10, sizeof=len)
+        cache.put("a", b"x" * 6)
+        cache.put("b", b"x" * 6)
+        self.assertNotIn("a", cache)
+        self.assertIn("b", cache)
+        cache.put("c", b"x" * 11)
+        self.assertNotIn("c", cache)
+        self.assertIn("b", cache)
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_weak_tier_serves_live_evicted_blocks(self):
+        cache = BlockCache(max_entries=1)
+        kept = _FakeBlock(b"\x01" * 32)
+        cache.put(kept.expr_id, kept)
+        cache.put(b"\x02" * 32, _FakeBlock(b"\x02" * 32))
+        gc.collect()
+
+        self.assertIs(cache.get(kept.expr_id), kept)
+        self.assertEqual(cache.weak_hits, 1)
+        self.assertIsNone(cache.get(b"\x02" * 32))
+
+    def test_evicted_chains_are_released(self):
+        cache = BlockCache(max_entries=4)
+        parent = _FakeBlock(b"\x01" * 32)
+        child = _FakeBlock(b"\x02" * 32)
+        child.previous_block = parent
+        cache.put(child.expr_id, child)
+        cache.put(parent.expr_id, parent)
+        for i in range(3, 7):
+            cache.put(bytes([i]) * 32, _FakeBlock(bytes([i]) * 32))
+        del parent, child
+        gc.collect()
+
+        self.assertIsNone(cache.get(b"\x01" * 32))
+        self.assertIsNone(cache.get(b"\x02" * 32))
+
+    def test_blocks_with_ancestors_are_not_pinned(self):
+        cache = BlockCache(max_entries=4)
+        parent = _FakeBlock(b"\x01" * 32)
+        child = _FakeBlock(b"\x02" * 32)
+        child.previous_block = parent
+        cache.put(child.expr_id, child)
+        self.assertNotIn(child.expr_id, cache)
+        self.assertIs(cache.get(child.expr_id), child)
+
+        del parent, child
+        gc.collect()
+        self.assertIsNone(cache.get(b"\x02" * 32))
+
+
+class _FakeAccounts:
+    def __init__(self, root_hash: bytes, accounts: dict) -> None:
+        self.root_hash = root_hash
+        self._accounts = accounts
+        self.loads = 0
+
+    def get_account(self, address: bytes, node=None):
+        self.loads += 1
+        return self._accounts.get(address)
+
+
+class TestAccountCache(unittest.TestCase):
+    def setUp(self):
+        account_cache.clear()
+
+    def test_hits_cached_per_root(self):
+        account = object()
+        accounts = _FakeAccounts(b"\x01" * 32, {b"a": account})
+        for _ in range(3):
+            self.assertIs(get_cached_account(None, accounts, b"a"), account)
+        self.assertEqual(accounts.loads, 1)
+
+        other_root = _FakeAccounts(b"\x02" * 32, {})
+        self.assertIsNone(get_cached_account(None, other_root, b"a"))
+        self.assertEqual(other_root.loads, 1)
+
+    def test_misses_are_retried(self):
+        accounts = _FakeAccounts(b"\x01" * 32, {})
+        self.assertIsNone(get_cached_account(None, accounts, b"a"))
+        # The trie node or account arrives later.
+        account = object()
+        accounts._accounts[b"a"] = account
+        self.assertIs(get_cached_account(None, accounts, b"a"), account)
+        self.assertIs(get_cached_account(None, accounts, b"a"), account)
+        self.assertEqual(accounts.loads, 2)
+
+
+class TestExprCache(unittest.TestCase):
+    def setUp(self):
+        expr_cache.clear()
+
+    def test_shares_one_expr_per_hash_with_seeded_hash(self):
+        expr = Expr("bytes", b"payload")
+        expr_id = expr.hash()
+        stored = {expr_id: Expr("bytes", b"payload")}
+        loads = []
+
+        def _get_expr(node, key):
+            loads.append(key)
+            return stored.get(key)
+
+        with mock.patch.object(expr_cache_module, "get_expr", _get_expr):
+            first = get_cached_expr(None, expr_id)
+            self.assertIs(get_cached_expr(None, expr_id), first)
+            self.assertIsNone(get_cached_expr(None, b"\x02" * 32))
+            self.assertIsNone(get_cached_expr(None, b"\x02" * 32))
+        self.assertEqual(first._hash, expr_id)
+        self.assertEqual(loads, [expr_id, b"\x02" * 32, b"\x02" * 32])
+
+
+if __name__ == "__main__":
+    unittest.main()
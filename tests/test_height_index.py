@@ -0,0 +1,141 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from astreum.expression import ZERO32
+
+from utils.height_index import HeightIndex, extend_height_index
+
+
+class _FakeBlock:
+    def __init__(self, height: int, tag: bytes, previous=None) -> None:
+        self.height = height
+        self.expr_id = bytes([height % 256]) + tag * 31
+        self.previous_block = previous
+        self.previous_block_hash = previous.expr_id if previous is not None else ZERO32
+
+
+def _make_chain(length: int, tag: bytes = b"a", base=None) -> list:
+    blocks = [] if base is None else list(base)
+    for _ in range(length):
+        previous = blocks[-1] if blocks else None
+        blocks.append(_FakeBlock(len(blocks), tag, previous))
+    return blocks
+
+
+class TestHeightIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_extend_and_reopen(self):
+        chain = _make_chain(10)
+        index = HeightIndex.open(self.data_dir)
+        extend_height_index(None, index, chain[-1], max_steps=100)
+        self.assertEqual(len(index), 10)
+        self.assertEqual(index.floor, 0)
+        self.assertEqual(index.get(3), chain[3].expr_id)
+        self.assertIsNone(index.get(10))
+        index.close()
+
+        reopened = HeightIndex.open(self.data_dir)
+        self.assertEqual(len(reopened), 10)
+        self.assertEqual(reopened.floor, 0)
+        self.assertEqual(reopened.get(9), chain[9].expr_id)
+        reopened.close()
+
+    def test_reorg_rolls_back(self):
+        chain = _make_chain(8)
+        index = HeightIndex.open(self.data_dir)
+        extend_height_index(None, index, chain[-1], max_steps=100)
+
+        fork = _make_chain(2, tag=b"b", base=chain[:5])
+        extend_height_index(None, index, fork[-1], max_steps=100)
+        self.assertEqual(len(index), 7)
+        self.assertEqual(index.get(4), chain[4].expr_id)
+        self.assertEqual(index.get(6), fork[6].expr_id)
+        self.assertIsNone(index.get(7))
+        index.close()
+
+    def test_reorg_deeper_than_max_steps(self):
+        chain = _make_chain(20)
+        index = HeightIndex.open(self.data_dir)
+        extend_height_index(None, index, chain[-1], max_steps=100)
+
+        fork = _make_chain(15, tag=b"b", base=chain[:5])
+        extend_height_index(None, index, fork[-1], max_steps=3)
+        for height in range(20):
+            self.assertEqual(index.get(height), fork[height].expr_id)
+        self.assertEqual(index.get(4), chain[4].expr_id)
+        index.close()
+
+    def test_backfill_rewrites_stale_slots_below_a_gap(self):
+        chain = _make_chain(10)
+        index = HeightIndex.open(self.data_dir)
+        extend_height_index(None, index, chain[-1], max_steps=100)
+
+        # The new tip is far above the index and forks below its top.
+        fork = _make_chain(25, tag=b"b", base=chain[:5])
+        by_hash = {block.expr_id: block for block in fork}
+        with mock.patch(
+            "utils.height_index.get_block_from_storage",
+            side_effect=lambda node, block_hash: by_hash[block_hash],
+        ):
+            for _ in range(10):
+                extend_height_index(None, index, fork[-1], max_steps=3)
+
+        self.assertEqual(index.floor, 0)
+        for height in range(30):
+            self.assertEqual(index.get(height), fork[height].expr_id)
+        index.close()
+
+    def test_backfill_resumes_from_floor(self):
+        chain = _make_chain(10)
+        by_hash = {block.expr_id: block for block in chain}
+        index = HeightIndex.open(self.data_dir)
+
+        with mock.patch(
+            "utils.height_index.get_block_from_storage",
+            side_effect=lambda node, block_hash: by_hash[block_hash],
+        ):
+            extend_height_index(None, index, chain[-1], max_steps=3)
+            self.assertEqual(index.floor, 7)
+            index.close()
+
+            index = HeightIndex.open(self.data_dir)
+            self.assertEqual(index.floor, 7)
+            extend_height_index(None, index, chain[-1], max_steps=100)
+
+        self.assertEqual(index.floor, 0)
+        self.assertEqual(index.get(0), chain[0].expr_id)
+        index.close()
+
+    def test_follower_sees_writer_growth(self):
+        chain = _make_chain(3)
+        writer = HeightIndex.open(self.data_dir)
+        extend_height_index(None, writer, chain[-1], max_steps=100)
+        follower = HeightIndex.open(self.data_dir)
+        self.assertEqual(len(follower), 3)
+
+        # Past the initial capacity, so the writer remaps a larger file.
+        far = 5000
+        writer.set(far, b"\x07" * 32)
+        self.assertIsNone(follower.get(far))
+        follower.follow(len(writer))
+        self.assertEqual(follower.get(far), b"\x07" * 32)
+        self.assertEqual(follower.get(2), chain[2].expr_id)
+        follower.close()
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
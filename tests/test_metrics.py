@@ -0,0 +1,42 @@
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.metrics import Counter, Histogram, render_gauge
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value, "/x")
+        self.assertEqual(
+            histogram.render()[2:],
+            [
+                'latency_seconds_bucket{route="/x",le="0.1"} 2',
+                'latency_seconds_bucket{route="/x",le="1"} 3',
+                'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+                'latency_seconds_sum{route="/x"} 2.65',
+                'latency_seconds_count{route="/x"} 4',
+            ],
+        )
+
+    def test_counter_and_gauge(self):
+        counter = Counter("requests_total", "Requests.", ("status",))
+        counter.inc("200")
+        counter.inc("200")
+        counter.inc("404")
+        self.assertEqual(
+            counter.render()[2:],
+            ['requests_total{status="200"} 2', 'requests_total{status="404"} 1'],
+        )
+        lines = render_gauge("depth", "Depth.", [((), 3), ((("q", 'a"b'),), None)])
+        self.assertEqual(lines, ["# HELP depth Depth.", "# TYPE depth gauge", "depth 3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
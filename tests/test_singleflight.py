@@ -0,0 +1,52 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from modes.api.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        async def _run():
+            flight = SingleFlight("test")
+            runs = []
+
+            async def _load():
+                runs.append(1)
+                await asyncio.sleep(0.01)
+                return {"value": 1}
+
+            results = await asyncio.gather(*(flight.do("k", _load) for _ in range(5)))
+            again = await flight.do("k", _load)
+            return results, again, len(runs), flight.calls, flight.coalesced, flight.in_flight
+
+        results, again, runs, calls, coalesced, in_flight = asyncio.run(_run())
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(again, {"value": 1})
+        self.assertEqual((runs, calls, coalesced, in_flight), (2, 2, 4, 0))
+
+    def test_errors_are_shared_and_cancelled_waiter_does_not_cancel_call(self):
+        async def _run():
+            flight = SingleFlight("test")
+
+            async def _fail():
+                await asyncio.sleep(0.01)
+                raise ValueError("missing")
+
+            first = asyncio.ensure_future(flight.do("k", _fail))
+            second = asyncio.ensure_future(flight.do("k", _fail))
+            await asyncio.sleep(0)
+            first.cancel()
+            outcome = await asyncio.gather(second, return_exceptions=True)
+            return [first.cancelled(), type(outcome[0]).__name__]
+
+        self.assertEqual(asyncio.run(_run()), [True, "ValueError"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import HTTPException
+
+from modes.api import executors
+from modes.api import transaction
+from utils.cache import LRUCache
+
+
+async def _run_inline(fn, *args):
+    return fn(*args)
+
+
+def _check(chunk):
+    checked = []
+    for index, payload in chunk:
+        if payload == "bad":
+            checked.append((index, None, HTTPException(status_code=400, detail="bad")))
+        else:
+            checked.append((index, SimpleNamespace(body_hash=payload), None))
+    return checked
+
+
+class TestSubmitAll(unittest.TestCase):
+    def setUp(self):
+        self.chunks = []
+        self.sent = []
+        self.failing = set()
+
+        def _check_payloads(chunk):
+            self.chunks.append([index for index, _ in chunk])
+            return _check(chunk)
+
+        def _send_transactions(node, txs):
+            self.sent.append([tx.body_hash for tx in txs])
+            return [
+                HTTPException(status_code=503, detail="send failed")
+                if tx.body_hash in self.failing
+                else {"success": True, "tx_hash": tx.body_hash}
+                for tx in txs
+            ]
+
+        patches = [
+            mock.patch.object(executors, "run_scan", _run_inline),
+            mock.patch.object(executors, "scan_executor", SimpleNamespace(workers=2)),
+            mock.patch.object(transaction, "_seen_body_hashes", LRUCache(max_entries=16)),
+            mock.patch.object(transaction, "_check_payloads", _check_payloads),
+            mock.patch.object(transaction, "_send_transactions", _send_transactions),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _submit(self, payloads):
+        return asyncio.run(transaction.submit_all(None, payloads))["results"]
+
+    def test_splits_into_one_chunk_per_worker_in_order(self):
+        results = self._submit(["a", "b", "bad", "c", "d"])
+        self.assertEqual(self.chunks, [[0, 1, 2], [3, 4]])
+        self.assertEqual(self.sent, [["a", "b"], ["c", "d"]])
+        self.assertEqual([result["index"] for result in results], [0, 1, 2, 3, 4])
+        self.assertEqual(results[2], {"index": 2, "error": "bad", "status": 400})
+        self.assertEqual(results[3]["result"], {"success": True, "tx_hash": "c"})
+
+    def test_rejects_duplicates_with_409(self):
+        results = self._submit(["a", "a"])
+        self.assertEqual(self.sent, [["a"]])
+        self.assertIn("result", results[0])
+        self.assertEqual(results[1]["status"], 409)
+
+        results = self._submit(["a"])
+        self.assertEqual(results, [{"index": 0, "error": "Transaction already submitted", "status": 409}])
+
+    def test_failed_send_can_be_retried(self):
+        self.failing = {"b"}
+        results = self._submit(["a", "b"])
+        self.assertIn("result", results[0])
+        self.assertEqual(results[1], {"index": 1, "error": "send failed", "status": 503})
+
+        self.failing = set()
+        results = self._submit(["a", "b"])
+        self.assertEqual(results[0]["status"], 409)
+        self.assertEqual(results[1]["result"], {"success": True, "tx_hash": "b"})
+
+    def test_rejected_chunk_clears_every_entry(self):
+        def _reject(node, txs):
+            raise HTTPException(status_code=503, detail="scan pool full")
+
+        with mock.patch.object(transaction, "_send_transactions", _reject):
+            results = self._submit(["a", "b"])
+        self.assertEqual([result["status"] for result in results], [503, 503])
+        results = self._submit(["a", "b"])
+        self.assertEqual(self.sent, [["a"], ["b"]])
+        self.assertTrue(all("result" in result for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
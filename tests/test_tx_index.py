@@ -0,0 +1,125 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from astreum.consensus.transaction import TransactionCode
+from astreum.consensus.transaction.model import Transaction
+from astreum.expression import Expr
+
+from utils import tx_index as tx_index_module
+from utils.tx_index import TxIndex
+
+
+def _h(tag: int) -> bytes:
+    return bytes([tag]) * 32
+
+
+class TestTxIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.index = TxIndex.open(Path(self._tmp.name))
+
+    def tearDown(self):
+        self.index.close()
+        self._tmp.cleanup()
+
+    def test_find_newest_first_within_range(self):
+        self.index.add_block(1, _h(0xB1), [(_h(1), _h(0xA), _h(0xB))])
+        self.index.add_block(2, _h(0xB2), [])
+        self.index.add_block(3, _h(0xB3), [(_h(3), _h(0xC), _h(0xB)), (_h(4), _h(0xA), _h(0xD))])
+
+        self.assertTrue(self.index.covers(1, 3))
+        self.assertFalse(self.index.covers(0, 3))
+        found = list(self.index.find(recipient=_h(0xB), high=3))
+        self.assertEqual(found, [(3, 0, _h(3), _h(0xB3)), (1, 0, _h(1), _h(0xB1))])
+        found = list(self.index.find(sender=_h(0xA), high=3, low=2))
+        self.assertEqual(found, [(3, 1, _h(4), _h(0xB3))])
+        found = list(self.index.find(recipient=_h(0xB), high=3, start_position=1))
+        self.assertEqual(found, [(1, 0, _h(1), _h(0xB1))])
+        with self.assertRaises(ValueError):
+            list(self.index.find(high=3))
+
+    def test_find_reads_in_batches(self):
+        for height in range(3):
+            self.index.add_block(height, _h(0xB0 + height), [(_h(height * 3 + i), _h(0xA), _h(0xB)) for i in range(3)])
+
+        expected = list(self.index.find(sender=_h(0xA), high=2, start_position=1, batch_size=100))
+        self.assertEqual([(height, position) for height, position, *_ in expected],
+                         [(2, 1), (2, 2), (1, 0), (1, 1), (1, 2), (0, 0), (0, 1), (0, 2)])
+        for batch_size in (1, 2, 3, 8):
+            found = list(self.index.find(sender=_h(0xA), high=2, start_position=1, batch_size=batch_size))
+            self.assertEqual(found, expected)
+
+        found = self.index.find(sender=_h(0xA), high=2, batch_size=2)
+        self.assertEqual(next(found)[:2], (2, 0))
+        found.close()
+
+    def test_truncate_and_reopen(self):
+        for height in range(4):
+            self.index.add_block(height, _h(0xB0 + height), [(_h(height), _h(0xA), _h(0xB))])
+        self.index.truncate(2)
+        self.assertEqual((self.index.floor, self.index.top), (0, 1))
+        self.assertEqual(list(self.index.find(tx_hash=_h(3), high=3)), [])
+
+        self.index.close()
+        self.index = TxIndex.open(Path(self._tmp.name))
+        self.assertEqual((self.index.floor, self.index.top), (0, 1))
+        self.assertEqual(self.index.block_hash(1), _h(0xB1))
+
+
+def _store_shallow(expr, store: dict):
+    """Store *expr* the way cold storage returns it: links carry only child hashes."""
+    if expr is None:
+        return None
+    expr_hash = expr.hash()
+    if expr.base == "link":
+        head_hash = _store_shallow(expr.head, store)
+        tail_hash = _store_shallow(expr.tail, store)
+        store[expr_hash] = Expr("link", head_hash=head_hash, tail_hash=tail_hash)
+    else:
+        store[expr_hash] = expr
+    return expr_hash
+
+
+class TestTransactionParties(unittest.TestCase):
+    def test_loads_only_the_body_links_and_both_parties(self):
+        data = Expr("bytes", value=b"x" * 4096)
+        tx = Transaction(
+            chain_id=1,
+            amount=5,
+            code=list(TransactionCode)[0],
+            counter=0,
+            data=data,
+            recipient=_h(0xB),
+            sender=_h(0xA),
+        )
+        store: dict = {}
+        tx_hash = _store_shallow(tx.to_expr(), store)
+        loaded = []
+
+        def _get_expr(node, expr_id):
+            loaded.append(expr_id)
+            return store.get(expr_id)
+
+        with mock.patch.object(tx_index_module, "get_expr", _get_expr):
+            self.assertEqual(tx_index_module._transaction_parties(None, tx_hash), (_h(0xA), _h(0xB)))
+            self.assertNotIn(data.hash(), loaded)
+            # Root, [body, signature], the eight body links, nil and two fields.
+            self.assertEqual(len(loaded), 13)
+
+            # The data payload is never needed; a missing header is an error.
+            del store[data.hash()]
+            self.assertEqual(tx_index_module._transaction_parties(None, tx_hash), (_h(0xA), _h(0xB)))
+            del store[store[tx_hash].head_hash]
+            with self.assertRaises(ValueError):
+                tx_index_module._transaction_parties(None, tx_hash)
+
+
+if __name__ == "__main__":
+    unittest.main()
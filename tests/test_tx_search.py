@@ -0,0 +1,90 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.tx_search import (
+    SearchBudget,
+    configure_search_workers,
+    decode_search_cursor,
+    encode_search_cursor,
+    ordered_chunks,
+)
+
+
+def _chunk(era: int, delay: float, started: list, finished: list):
+    def _scan(cancel: threading.Event) -> list:
+        started.append(era)
+        deadline = time.monotonic() + delay
+        while time.monotonic() < deadline:
+            if cancel.is_set():
+                return [], None
+            time.sleep(0.005)
+        finished.append(era)
+        return [(era * 10 + 1, 0, f"tx{era}a"), (era * 10, 0, f"tx{era}b")], None
+
+    return _scan
+
+
+class TestOrderedMatches(unittest.TestCase):
+    def setUp(self):
+        configure_search_workers({"search_workers": 4})
+
+    def test_merges_in_chunk_order(self):
+        started, finished = [], []
+        # Later (older) chunks finish first; results must still come out newest first.
+        chunks = [_chunk(era, 0.01 * era, started, finished) for era in range(5, 0, -1)]
+        heights = [
+            height
+            for matches, _ in ordered_chunks(chunks, 4)
+            for height, _, _ in matches
+        ]
+        self.assertEqual(heights, sorted(heights, reverse=True))
+        self.assertEqual(len(heights), 10)
+
+    def test_closing_cancels_outstanding_chunks(self):
+        started, finished = [], []
+        chunks = [_chunk(0, 0.0, started, finished)] + [
+            _chunk(era, 0.5, started, finished) for era in range(1, 20)
+        ]
+        results = ordered_chunks(chunks, 4)
+        next(results)
+        results.close()
+        time.sleep(0.1)
+        self.assertLessEqual(len(started), 5)
+        self.assertEqual(finished, [0])
+
+
+class TestSearchCursor(unittest.TestCase):
+    def test_round_trip(self):
+        cursor = encode_search_cursor(123456, 7, b"\xab" * 32)
+        self.assertEqual(decode_search_cursor(cursor), (123456, 7, b"\xab" * 32))
+        with self.assertRaises(ValueError):
+            decode_search_cursor(cursor[:-4])
+        with self.assertRaises(ValueError):
+            decode_search_cursor("not a cursor!")
+
+
+class TestSearchBudget(unittest.TestCase):
+    def test_block_limit(self):
+        budget = SearchBudget(max_blocks=2)
+        self.assertTrue(budget.take_block())
+        self.assertTrue(budget.take_block())
+        self.assertFalse(budget.take_block())
+        self.assertEqual(budget.exhausted, "max_blocks_scanned")
+
+    def test_deadline(self):
+        budget = SearchBudget(timeout=0.01)
+        self.assertFalse(budget.expired())
+        time.sleep(0.02)
+        self.assertFalse(budget.take_block())
+        self.assertEqual(budget.exhausted, "timeout")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+from typing import Any, Optional
+
+from astreum.consensus.models.accounts import Accounts
+
+from utils.cache import LRUCache
+
+DEFAULT_ACCOUNT_CACHE_MAX_ENTRIES = 65536
+DEFAULT_ACCOUNT_TRIE_NODE_CACHE_MAX_ENTRIES = 65536
+
+# Radix nodes are keyed by content hash, so one cache can back every
+# read-only accounts trie: consecutive roots share most upper levels.
+trie_node_cache = LRUCache(max_entries=DEFAULT_ACCOUNT_TRIE_NODE_CACHE_MAX_ENTRIES)
+
+# (accounts_hash, address) -> Account.  Roots are immutable, so entries
+# never need invalidation.
+account_cache = LRUCache(max_entries=DEFAULT_ACCOUNT_CACHE_MAX_ENTRIES)
+
+
+def configure_account_caches(cli_configs: dict[str, Any]) -> None:
+    """Apply the ``cli.account_*cache_max_entries`` limits to the shared caches."""
+    account_cache.resize(
+        max_entries=cli_configs.get(
+            "account_cache_max_entries", DEFAULT_ACCOUNT_CACHE_MAX_ENTRIES
+        ),
+    )
+    trie_node_cache.resize(
+        max_entries=cli_configs.get(
+            "account_trie_node_cache_max_entries",
+            DEFAULT_ACCOUNT_TRIE_NODE_CACHE_MAX_ENTRIES,
+        ),
+    )
+
+
+def open_accounts(accounts_hash: bytes) -> Accounts:
+    """Return a read-only ``Accounts`` view of *accounts_hash* backed by the shared node cache.
+
+    Never call ``set_account`` / ``update_trie`` on it: writes would mutate
+    nodes shared with other roots.
+    """
+    accounts = Accounts(root_hash=accounts_hash)
+    accounts._trie.nodes = trie_node_cache
+    return accounts
+
+
+def get_cached_account(node: Any, accounts: Accounts, address: bytes) -> Optional[Any]:
+    """Return the account at *address* under *accounts*, loading it at most once per root.
+
+    Storage errors propagate and are not cached.  Neither are misses:
+    ``get_account`` also returns None when a trie node or the account is
+    not available locally yet, and it may still arrive.
+    """
+    key = (accounts.root_hash, address)
+    account = account_cache.get(key)
+    if account is not None:
+        return account
+
+    account = accounts.get_account(address, node)
+    if account is not None:
+        account_cache.put(key, account)
+    return account
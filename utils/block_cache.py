@@ -0,0 +1,132 @@
+import weakref
+from typing import Any, Hashable, Optional
+
+from astreum.consensus.block.encoding.decode import get_block_from_storage
+
+from utils.cache import LRUCache
+
+DEFAULT_BLOCK_CACHE_MAX_ENTRIES = 1024
+DEFAULT_BLOCK_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Rough per-object overhead of a decoded Block (instance dict, ints, Accounts
+# wrapper, bloom tree shell) on top of the byte fields counted explicitly.
+_BLOCK_BASE_SIZE = 2048
+_STATISTICS_ENTRY_SIZE = 4 * 32
+
+
+def estimate_block_size(block: Any) -> int:
+    """Approximate the memory held by a decoded block, excluding its ancestors."""
+    size = _BLOCK_BASE_SIZE
+    for attr in (
+        "expr_id",
+        "previous_block_hash",
+        "accounts_hash",
+        "transactions_hash",
+        "receipts_hash",
+        "validator_public_key_bytes",
+        "bloom_hash",
+        "previous_era_hash",
+        "body_hash",
+        "signature",
+    ):
+        value = getattr(block, attr, None)
+        if value:
+            size += len(value)
+    size += len(getattr(block, "statistics", None) or ()) * _STATISTICS_ENTRY_SIZE
+
+    bloom_tree = getattr(block, "bloom_tree", None)
+    root = getattr(bloom_tree, "root", None)
+    if root is not None:
+        size += sum(len(tier) for tier in root.filter.tiers)
+    return size
+
+
+class BlockCache(LRUCache):
+    """LRU of decoded blocks keyed by expr hash, with a weak second tier.
+
+    The LRU part holds strong references within the entry/byte budget and
+    sizes each block on its own.  Only blocks with no ``previous_block``
+    attached are held strongly; a block carrying an ancestor chain is
+    tracked weakly only, so the cache never pins (or miscounts) ancestors.
+    Callers must not attach ``previous_block`` to a block they got from the
+    cache; decode a fresh copy for walks instead.  Every cached block is
+    also tracked weakly: after eviction it can still be served while
+    something else, such as ``node.latest_block``, keeps it alive.  Blocks
+    are content-addressed, so entries never need invalidation.
+    """
+
+    def __init__(self, *, max_entries: int, max_bytes: Optional[int] = None) -> None:
+        super().__init__(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            sizeof=estimate_block_size,
+        )
+        self._weak: "weakref.WeakValueDictionary[Hashable, Any]" = weakref.WeakValueDictionary()
+        self.weak_hits = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            block = self._weak.get(key)
+            if block is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.weak_hits += 1
+            if getattr(block, "previous_block", None) is None:
+                self._insert_locked(key, block, estimate_block_size(block))
+            return block
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        with self._lock:
+            self._weak[key] = value
+            if getattr(value, "previous_block", None) is None:
+                self._insert_locked(key, value, estimate_block_size(value) if size is None else size)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._weak.pop(key, None)
+        super().discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._weak.clear()
+        super().clear()
+
+    def stats(self) -> dict[str, int]:
+        stats = super().stats()
+        stats["weak_hits"] = self.weak_hits
+        stats["weak_entries"] = len(self._weak)
+        return stats
+
+
+block_cache = BlockCache(
+    max_entries=DEFAULT_BLOCK_CACHE_MAX_ENTRIES,
+    max_bytes=DEFAULT_BLOCK_CACHE_MAX_BYTES,
+)
+
+
+def configure_block_cache(cli_configs: dict[str, Any]) -> None:
+    """Apply the ``cli.block_cache_*`` limits to the shared block cache."""
+    block_cache.resize(
+        max_entries=cli_configs.get("block_cache_max_entries", DEFAULT_BLOCK_CACHE_MAX_ENTRIES),
+        max_bytes=cli_configs.get("block_cache_max_bytes", DEFAULT_BLOCK_CACHE_MAX_BYTES),
+    )
+
+
+def get_cached_block(node: Any, block_hash: bytes) -> Any:
+    """Return the decoded block for *block_hash*, decoding it at most once.
+
+    Raises ValueError like ``get_block_from_storage`` when the block cannot be
+    loaded; failures are not cached.
+    """
+    block = block_cache.get(block_hash)
+    if block is not None:
+        return block
+    block = get_block_from_storage(node, block_hash)
+    block_cache.put(block_hash, block)
+    return block
@@ -0,0 +1,64 @@
+import copy
+from typing import Any, Optional
+
+from astreum.consensus.block.rate import calculate_discount_rate
+from astreum.expression import ZERO32
+
+from utils.block_cache import get_cached_block
+from utils.cache import LRUCache
+from utils.latest_block import add_latest_block_listener
+
+DEFAULT_BLOCK_RATE_CACHE_MAX_ENTRIES = 65536
+
+# Rates are a pure function of the (immutable) parent block, so entries
+# never need invalidation; only successful results are cached, since a
+# missing parent may still be synced later.
+rate_cache = LRUCache(max_entries=DEFAULT_BLOCK_RATE_CACHE_MAX_ENTRIES)
+
+
+def configure_block_rate_cache(cli_configs: dict[str, Any]) -> None:
+    """Apply the ``cli.block_rate_cache_max_entries`` limit to the shared rate cache."""
+    rate_cache.resize(
+        max_entries=cli_configs.get(
+            "block_rate_cache_max_entries", DEFAULT_BLOCK_RATE_CACHE_MAX_ENTRIES
+        ),
+    )
+
+
+def get_block_rate(node: Any, block: Any) -> Optional[float]:
+    """Return the all-time discount rate of *block*, computing it at most once.
+
+    Returns None when the rate is not available (e.g. the parent block is
+    missing or has no stake yet).
+    """
+    block_hash = block.expr_id
+    if block_hash is not None:
+        rate = rate_cache.get(block_hash)
+        if rate is not None:
+            return rate
+
+    previous = block.previous_block
+    prev_hash = block.previous_block_hash
+    if previous is None and node is not None and prev_hash and prev_hash != ZERO32:
+        try:
+            previous = get_cached_block(node, prev_hash)
+        except ValueError:
+            return None
+
+    # *block* is shared through the block cache and used by other threads,
+    # so the parent is attached to a shallow copy, never to the block.
+    view = copy.copy(block)
+    view.previous_block = previous
+    try:
+        rate = calculate_discount_rate(view, node=node)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+    if block_hash is not None:
+        rate_cache.put(block_hash, rate)
+    return rate
+
+
+def precompute_tip_rates(node: Any) -> None:
+    """Compute the rate of each new latest block on the poller thread as it arrives."""
+    add_latest_block_listener(node, lambda block: get_block_rate(node, block))
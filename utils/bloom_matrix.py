@@ -0,0 +1,322 @@
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import numpy as np
+
+from astreum.consensus.block.encoding.decode import get_block_from_storage
+from astreum.crypto.bloom_filter.insert import _bloom_positions
+from astreum.crypto.bloom_search import ERA_SIZE
+from astreum.expression import ZERO32
+from astreum.storage.get.single import get_expr
+
+from utils.height_index import sync_height_range
+from utils.latest_block import start_index_worker
+
+BLOOM_MATRIX_DIR_NAME = "bloom_matrix"
+
+_COLUMNS = ERA_SIZE // 8
+_HASH_SIZE = 32
+
+
+def _tier_bits(tier: int) -> int:
+    # Tier t of a leaf filter holds 2**t elements at 10 bits each, rounded up to bytes.
+    return ((1 << tier) * 10 + 7) // 8 * 8
+
+
+class _Era:
+    """Bit-sliced blooms of one era: row *p* of tier *t* packs bit *p* of every block.
+
+    Column byte ``offset // 8``, bit ``offset % 8`` belongs to the block at
+    ``offset`` within the era, so testing one bloom position across the
+    whole era is a single row read.
+    """
+
+    def __init__(self, era: int, directory: Optional[Path]) -> None:
+        self.era = era
+        self.directory = directory
+        self.hashes = self._array("hashes", (ERA_SIZE, _HASH_SIZE))
+        self.tiers: list[np.ndarray] = []
+        if directory is not None:
+            while self._path(f"tier{len(self.tiers)}").exists():
+                tier = len(self.tiers)
+                self.tiers.append(self._array(f"tier{tier}", (_tier_bits(tier), _COLUMNS)))
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{self.era:08d}.{name}"
+
+    def _array(self, name: str, shape: tuple[int, int]) -> np.ndarray:
+        if self.directory is None:
+            return np.zeros(shape, dtype=np.uint8)
+        path = self._path(name)
+        return np.memmap(path, dtype=np.uint8, mode="r+" if path.exists() else "w+", shape=shape)
+
+    def tier(self, tier: int) -> np.ndarray:
+        while len(self.tiers) <= tier:
+            index = len(self.tiers)
+            self.tiers.append(self._array(f"tier{index}", (_tier_bits(index), _COLUMNS)))
+        return self.tiers[tier]
+
+    def filled(self) -> np.ndarray:
+        """Offsets within the era that hold a block."""
+        return np.flatnonzero(self.hashes.any(axis=1))
+
+    def clear_from(self, offset: int) -> None:
+        self.hashes[offset:] = 0
+        column, bit = divmod(offset, 8)
+        for rows in self.tiers:
+            rows[:, column] &= (1 << bit) - 1
+            rows[:, column + 1:] = 0
+
+    def flush(self) -> None:
+        for array in (self.hashes, *self.tiers):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def delete(self) -> None:
+        if self.directory is None:
+            return
+        names = ["hashes"] + [f"tier{tier}" for tier in range(len(self.tiers))]
+        self.hashes = None
+        self.tiers = []
+        for name in names:
+            self._path(name).unlink(missing_ok=True)
+
+
+class BloomMatrix:
+    """Per-block transaction blooms of the chain, bit-sliced per era for vectorized search.
+
+    Each block's leaf bloom (from its era bloom tree) is stored column-wise,
+    so checking the K positions of a query element against every block of
+    an era is K row reads and an AND, instead of loading and testing each
+    bloom in turn.  With *directory* the eras are memory-mapped files and
+    survive restarts; otherwise they live in memory.
+
+    Like ``TxIndex`` it covers a contiguous height range ``[floor, top]``.
+    """
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._eras: dict[int, _Era] = {}
+        self.floor: Optional[int] = None
+        self.top: Optional[int] = None
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+            for path in directory.glob("*.hashes"):
+                era = int(path.stem)
+                self._eras[era] = _Era(era, directory)
+        self._load_range()
+
+    @classmethod
+    def open(cls, data_dir: Path, *, mmap: bool = True) -> "BloomMatrix":
+        return cls(Path(data_dir) / BLOOM_MATRIX_DIR_NAME if mmap else None)
+
+    def _load_range(self) -> None:
+        heights = np.concatenate(
+            [era * ERA_SIZE + segment.filled() for era, segment in self._eras.items()]
+            or [np.empty(0, dtype=np.int64)]
+        )
+        if heights.size == 0:
+            self.floor = self.top = None
+            return
+        heights.sort()
+        # Contiguous run ending at the highest indexed height.
+        gaps = np.flatnonzero(np.diff(heights) != 1)
+        self.top = int(heights[-1])
+        self.floor = int(heights[gaps[-1] + 1]) if gaps.size else int(heights[0])
+
+    def covers(self, low: int, high: int) -> bool:
+        """Return True if every height in ``[low, high]`` is in the matrix."""
+        floor, top = self.floor, self.top
+        return floor is not None and floor <= low and high <= top
+
+    def block_hash(self, height: int) -> Optional[bytes]:
+        era, offset = divmod(height, ERA_SIZE)
+        with self._lock:
+            segment = self._eras.get(era)
+            if segment is None:
+                return None
+            block_hash = segment.hashes[offset].tobytes()
+        return None if block_hash == ZERO32 else block_hash
+
+    def add_block(self, height: int, block_hash: bytes, tiers: list[bytes]) -> None:
+        """Record the leaf bloom *tiers* of the block at *height* (empty if it has no transactions)."""
+        era, offset = divmod(height, ERA_SIZE)
+        column, bit = divmod(offset, 8)
+        mask = np.uint8(1 << bit)
+        with self._lock:
+            segment = self._eras.get(era)
+            if segment is None:
+                segment = self._eras[era] = _Era(era, self.directory)
+            for rows in segment.tiers:
+                rows[:, column] &= ~mask
+            for tier, data in enumerate(tiers):
+                rows = segment.tier(tier)
+                bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little")
+                rows[np.flatnonzero(bits), column] |= mask
+            segment.hashes[offset] = np.frombuffer(block_hash, dtype=np.uint8)
+            self.floor = height if self.floor is None else min(self.floor, height)
+            self.top = height if self.top is None else max(self.top, height)
+
+    def truncate(self, height: int) -> None:
+        """Drop every block at or above *height* (used on reorgs)."""
+        first_era, offset = divmod(height, ERA_SIZE)
+        with self._lock:
+            for era in [era for era in self._eras if era > first_era]:
+                self._eras.pop(era).delete()
+            segment = self._eras.get(first_era)
+            if segment is not None:
+                segment.clear_from(offset)
+            self._load_range()
+
+    def candidates(self, element: bytes, *, high: int, low: int = 0) -> Iterator[tuple[int, bytes]]:
+        """Yield ``(height, block_hash)`` of blocks whose bloom may hold *element*, newest first."""
+        for era in range(high // ERA_SIZE, low // ERA_SIZE - 1, -1):
+            with self._lock:
+                segment = self._eras.get(era)
+                if segment is None:
+                    continue
+                hits = np.zeros(_COLUMNS, dtype=np.uint8)
+                for rows in segment.tiers:
+                    positions = _bloom_positions(element, rows.shape[0])
+                    hits |= np.bitwise_and.reduce(rows[positions], axis=0)
+                offsets = np.flatnonzero(np.unpackbits(hits, bitorder="little"))
+                base = era * ERA_SIZE
+                offsets = offsets[(offsets >= low - base) & (offsets <= high - base)]
+                found = [(base + int(offset), segment.hashes[offset].tobytes()) for offset in offsets[::-1]]
+            yield from found
+
+    def flush(self) -> None:
+        with self._lock:
+            for segment in self._eras.values():
+                segment.flush()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._eras.clear()
+
+
+def _child(node: Any, link: Any, *, head: bool) -> Optional[Any]:
+    """Return the shallow head or tail of *link*, loading it by hash unless it is inline."""
+    inline = link.head if head else link.tail
+    if inline is not None:
+        return inline
+    child_hash = link.head_hash if head else link.tail_hash
+    if child_hash is None or child_hash == ZERO32:
+        return None
+    child = get_expr(node, child_hash)
+    if child is None:
+        raise ValueError(f"bloom tree expr {child_hash.hex()[:16]} not found")
+    return child
+
+
+def _list_items(node: Any, expr: Any) -> Iterator[Any]:
+    """Yield the shallow heads of the list *expr*, up to nil (a link with no head)."""
+    while expr is not None and expr.base == "link" and (expr.head is not None or expr.head_hash is not None):
+        yield _child(node, expr, head=True)
+        expr = _child(node, expr, head=False)
+
+
+def _ref_hash(ref: Any) -> Optional[bytes]:
+    # Child refs are nil or a link whose head is the child node's hash.
+    if ref is None or ref.base != "link":
+        return None
+    if ref.head_hash is not None:
+        return ref.head_hash
+    return ref.head.hash() if ref.head is not None else None
+
+
+def _block_leaf_tiers(node: Any, block: Any) -> list[bytes]:
+    """Return the tiers of *block*'s own leaf in its era bloom tree.
+
+    Descends by offset the way astreum's ``_storage_find_leaf`` does, but
+    reads each node shallowly (``[block_ref, left_ref, right_ref,
+    filter]``): only the child refs on the path and the reached leaf's
+    filter tiers are loaded, never the rest of the era's tree.  Blocks
+    without transactions have no leaf and yield no tiers.
+    """
+    root_hash = block.bloom_hash
+    if not root_hash or root_hash == ZERO32:
+        return []
+    offset = block.height % ERA_SIZE
+    low, high = 0, ERA_SIZE
+    node_hash = root_hash
+    while True:
+        expr = get_expr(node, node_hash)
+        if expr is None:
+            raise ValueError(f"bloom tree node {node_hash.hex()[:16]} not found")
+        fields = list(_list_items(node, expr))
+        if len(fields) != 4 or fields[3] is None or fields[3].base != "link":
+            raise ValueError(f"malformed bloom tree node {node_hash.hex()[:16]}")
+        left_hash, right_hash = _ref_hash(fields[1]), _ref_hash(fields[2])
+        if left_hash is None and right_hash is None:
+            # Filter: [start_ref, count, tier, ...]; the start ref is skipped.
+            counted = _child(node, fields[3], head=False)
+            tiers = list(_list_items(node, _child(node, counted, head=False))) if counted is not None else []
+            return [bytes(tier.value) for tier in tiers]
+        middle = (low + high) // 2
+        if offset < middle:
+            node_hash, high = left_hash, middle
+        else:
+            node_hash, low = right_hash, middle
+        if node_hash is None:
+            return []
+
+
+def _index_height(node: Any, matrix: BloomMatrix, height: int, block_hash: bytes) -> None:
+    block = get_block_from_storage(node, block_hash)
+    matrix.add_block(height, block_hash, _block_leaf_tiers(node, block))
+
+
+def sync_bloom_matrix(node: Any, matrix: BloomMatrix, height_index: Any, *, max_blocks: int) -> int:
+    """Bring *matrix* in line with *height_index*, adding at most *max_blocks* blocks."""
+    indexed = sync_height_range(
+        matrix,
+        height_index,
+        max_blocks=max_blocks,
+        index_height=lambda height, block_hash: _index_height(node, matrix, height, block_hash),
+    )
+    if indexed:
+        matrix.flush()
+    return indexed
+
+
+def start_bloom_matrix_worker(
+    *,
+    node: Any,
+    data_dir: Path,
+    mmap: bool,
+    sync_steps: int,
+    idle_interval: float,
+) -> Callable[[], None]:
+    """
+    Start a background thread that maintains the bloom matrix, exposed as ``node.bloom_matrix``.
+
+    New blocks are added as they arrive and history is backfilled
+    *sync_steps* blocks per pass against ``node.height_index``.  With
+    *mmap* the matrix is kept in *data_dir* and reused on restart.
+
+    Returns a callable to stop the worker; it waits for thread exit when invoked.
+    """
+    matrix = BloomMatrix.open(data_dir, mmap=mmap)
+    node.bloom_matrix = matrix
+
+    def _sync() -> int:
+        height_index = getattr(node, "height_index", None)
+        if height_index is None:
+            return 0
+        return sync_bloom_matrix(node, matrix, height_index, max_blocks=sync_steps)
+
+    def _close() -> None:
+        node.bloom_matrix = None
+        matrix.close()
+
+    return start_index_worker(
+        node=node,
+        name="bloom-matrix-worker",
+        sync=_sync,
+        idle_interval=idle_interval,
+        on_stop=_close,
+    )
@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+def _default_sizeof(value: Any) -> int:
+    return 1
+
+
+class LRUCache:
+    """Thread-safe LRU mapping bounded by entry count and an approximate byte budget.
+
+    Values are sized with *sizeof* when inserted; the least recently used
+    entries are evicted until both limits hold again.  Hit, miss and eviction
+    counters are kept for diagnostics and exposed through ``stats()``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = _default_sizeof,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value cached for *key*, marking it most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        """Insert or replace *key*, evicting older entries to stay within budget."""
+        if size is None:
+            size = self._sizeof(value)
+        with self._lock:
+            self._insert_locked(key, value, size)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.put(key, value)
+
+    def discard(self, key: Hashable) -> None:
+        """Remove *key* if present (not counted as an eviction)."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def resize(self, *, max_entries: int, max_bytes: Optional[int] = None) -> None:
+        """Change the limits, evicting immediately if the cache is now over budget."""
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict_locked()
+
+    def stats(self) -> dict[str, int]:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _insert_locked(self, key: Hashable, value: Any, size: int) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Never cache a single value larger than the whole budget.
+            return
+        self._entries[key] = (value, size)
+        self._bytes += size
+        self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
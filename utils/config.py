@@ -27,10 +27,61 @@ def load_config(data_dir: Path) -> dict[str, Any]:
     default_cli_configs = {
         "api_host": "127.0.0.1",
         "api_port": 52781,
+        "api_lookup_workers": 16,
+        "api_lookup_queue_limit": 256,
+        "api_scan_workers": 4,
+        "api_scan_queue_limit": 16,
+        "api_batch_max_ids": 100,
+        "api_body_cache_max_entries": 65536,
+        "api_body_cache_max_bytes": 64 * 1024 * 1024,
+        "api_expr_tree_max_nodes": 4096,
+        "api_transactions_max_items": 1000,
+        "api_transactions_seen_max_entries": 65536,
+        "api_max_connections": 16384,
+        "api_workers": 0,
+        "api_workers_poll_interval": 0.25,
+        "api_workers_segment_bytes": 64 * 1024,
+        "api_lookup_max_in_flight": 64,
+        "api_lookup_max_queued": 256,
+        "api_scan_max_in_flight": 8,
+        "api_scan_max_queued": 16,
+        "api_submit_max_in_flight": 4,
+        "api_submit_max_queued": 16,
+        "api_stream_max_in_flight": 10000,
+        "api_stream_max_queued": 0,
+        "api_lookup_rate_limit": 200.0,
+        "api_lookup_rate_burst": 400,
+        "api_scan_rate_limit": 10.0,
+        "api_scan_rate_burst": 40,
+        "api_submit_rate_limit": 20.0,
+        "api_submit_rate_burst": 100,
+        "api_stream_rate_limit": 1.0,
+        "api_stream_rate_burst": 10,
+        "api_rate_limit_max_clients": 10000,
+        "api_trusted_proxies": [],
         "on_startup_connect_node": True,
         "on_startup_validate_blockchain": True,
         "on_startup_verify_blockchain": False,
         "latest_block_hash_poll_interval": 10.0,
+        "block_cache_max_entries": 1024,
+        "block_cache_max_bytes": 64 * 1024 * 1024,
+        "block_rate_cache_max_entries": 65536,
+        "block_rate_precompute": True,
+        "account_cache_max_entries": 65536,
+        "account_trie_node_cache_max_entries": 65536,
+        "expr_cache_max_entries": 65536,
+        "expr_cache_max_bytes": 64 * 1024 * 1024,
+        "height_index_sync_steps": 4096,
+        "tx_index_enabled": False,
+        "tx_index_sync_steps": 256,
+        "bloom_matrix_enabled": False,
+        "bloom_matrix_mmap": True,
+        "bloom_matrix_sync_steps": 1024,
+        "search_workers": 4,
+        "search_max_blocks_scanned": 10000,
+        "search_max_blocks_scanned_cap": 100000,
+        "search_timeout_ms": 5000,
+        "search_timeout_ms_cap": 30000,
     }
     
     for k, v in default_cli_configs.items():
@@ -0,0 +1,57 @@
+from typing import Any, Optional
+
+from astreum.expression import Expr, ZERO32
+from astreum.storage.get.single import get_expr
+
+from utils.cache import LRUCache
+
+DEFAULT_EXPR_CACHE_MAX_ENTRIES = 65536
+DEFAULT_EXPR_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Rough per-object overhead of a shallow Expr (instance dict, hash refs).
+_EXPR_BASE_SIZE = 256
+
+
+def estimate_expr_size(expr: Expr) -> int:
+    """Approximate the memory held by a shallow expr (children are cached on their own)."""
+    value = expr.value if expr.base in ("bytes", "symbol") else None
+    return _EXPR_BASE_SIZE + (len(value) if value else 0)
+
+
+# Shallow exprs keyed by hash.  Every reader gets the same object, so the
+# hash and size it memoizes are computed once per process, not per request.
+# Exprs are content-addressed, so entries never need invalidation.
+expr_cache = LRUCache(
+    max_entries=DEFAULT_EXPR_CACHE_MAX_ENTRIES,
+    max_bytes=DEFAULT_EXPR_CACHE_MAX_BYTES,
+    sizeof=estimate_expr_size,
+)
+
+
+def configure_expr_cache(cli_configs: dict[str, Any]) -> None:
+    """Apply the ``cli.expr_cache_*`` limits to the shared expr cache."""
+    expr_cache.resize(
+        max_entries=cli_configs.get("expr_cache_max_entries", DEFAULT_EXPR_CACHE_MAX_ENTRIES),
+        max_bytes=cli_configs.get("expr_cache_max_bytes", DEFAULT_EXPR_CACHE_MAX_BYTES),
+    )
+
+
+def get_cached_expr(node: Any, expr_id: bytes) -> Optional[Expr]:
+    """Return the shallow expr for *expr_id* like ``get_expr``, loading it at most once.
+
+    Missing exprs are not cached, since they may still arrive.  Callers must
+    treat the result as read-only: it is shared with every other reader.
+    """
+    if expr_id == ZERO32:
+        return get_expr(node, expr_id)
+    expr = expr_cache.get(expr_id)
+    if expr is not None:
+        return expr
+    expr = get_expr(node, expr_id)
+    if expr is None:
+        return None
+    # It was fetched by its content hash; seed Expr's own memo so the hash
+    # is never recomputed over the value.
+    expr._hash = expr_id
+    expr_cache.put(expr_id, expr)
+    return expr
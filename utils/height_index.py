@@ -0,0 +1,260 @@
+import itertools
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from astreum.consensus.block.encoding.decode import get_block_from_storage
+from astreum.crypto.bloom_search.block_search import find_block_by_height
+from astreum.expression import ZERO32
+
+from utils.block_cache import get_cached_block
+
+HEIGHT_INDEX_FILE_NAME = "block_heights.bin"
+SLOT_SIZE = 32
+_INITIAL_CAPACITY = 4096
+
+
+class HeightIndex:
+    """Memory-mapped array of 32-byte block hashes indexed by height.
+
+    Slot *h* of the file holds the hash of the block at height *h* on the
+    current best chain; an all-zero slot means the height is not indexed
+    yet.  The file grows by doubling and never shrinks; rollbacks only zero
+    slots.  ``floor`` tracks the lowest height from which every slot up to
+    the tip is filled, so a backfill can resume after a restart.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "r+b" if path.exists() else "w+b")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _INITIAL_CAPACITY * SLOT_SIZE:
+            size = _INITIAL_CAPACITY * SLOT_SIZE
+            self._file.truncate(size)
+        self._capacity = size // SLOT_SIZE
+        self._map = mmap.mmap(self._file.fileno(), self._capacity * SLOT_SIZE)
+
+        used = len(self._map[:].rstrip(b"\x00"))
+        self._length = (used + SLOT_SIZE - 1) // SLOT_SIZE
+        self.floor = self._last_empty_slot(self._length) + 1
+
+    @classmethod
+    def open(cls, data_dir: Path) -> "HeightIndex":
+        return cls(data_dir / HEIGHT_INDEX_FILE_NAME)
+
+    def __len__(self) -> int:
+        """Number of heights covered, i.e. the indexed tip height plus one."""
+        return self._length
+
+    def get(self, height: int) -> Optional[bytes]:
+        """Return the block hash at *height*, or None if it is not indexed."""
+        if height < 0:
+            return None
+        with self._lock:
+            if height >= self._length:
+                return None
+            block_hash = self._slot(height)
+        if block_hash == ZERO32:
+            return None
+        return block_hash
+
+    def set(self, height: int, block_hash: bytes) -> None:
+        if len(block_hash) != SLOT_SIZE:
+            raise ValueError(f"block hash must be {SLOT_SIZE} bytes")
+        with self._lock:
+            if height >= self._capacity:
+                self._grow(height + 1)
+            offset = height * SLOT_SIZE
+            self._map[offset:offset + SLOT_SIZE] = block_hash
+            if height >= self._length:
+                if height > self._length:
+                    self.floor = height
+                self._length = height + 1
+            elif height == self.floor - 1:
+                self.floor -= 1
+                while self.floor > 0 and self._slot(self.floor - 1) != ZERO32:
+                    self.floor -= 1
+
+    def truncate(self, length: int) -> None:
+        """Forget every height >= *length* (used when the chain reorgs lower)."""
+        with self._lock:
+            if length >= self._length:
+                return
+            start = length * SLOT_SIZE
+            end = self._length * SLOT_SIZE
+            self._map[start:end] = bytes(end - start)
+            self._length = length
+            if self.floor > length:
+                self.floor = length
+
+    def follow(self, length: int) -> None:
+        """Adopt *length* as published by the process that writes the file.
+
+        For read-only followers in other processes: slot writes show up
+        through the shared mapping, but the covered length does not, and
+        the file may have grown past the local mapping.
+        """
+        with self._lock:
+            if length > self._capacity:
+                size = os.fstat(self._file.fileno()).st_size
+                self._map.close()
+                self._capacity = size // SLOT_SIZE
+                self._map = mmap.mmap(self._file.fileno(), self._capacity * SLOT_SIZE)
+            self._length = min(length, self._capacity)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._map.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+
+    def _slot(self, height: int) -> bytes:
+        offset = height * SLOT_SIZE
+        return self._map[offset:offset + SLOT_SIZE]
+
+    def _last_empty_slot(self, end: int) -> int:
+        """Return the highest all-zero slot below *end*, or -1 if there is none."""
+        stop = end * SLOT_SIZE
+        while True:
+            pos = self._map.rfind(ZERO32, 0, stop)
+            if pos < 0:
+                return -1
+            if pos % SLOT_SIZE == 0:
+                return pos // SLOT_SIZE
+            # Zero run straddling two hashes; keep looking below it.
+            stop = pos + SLOT_SIZE - 1
+
+    def _grow(self, minimum: int) -> None:
+        capacity = self._capacity
+        while capacity < minimum:
+            capacity *= 2
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(capacity * SLOT_SIZE)
+        self._capacity = capacity
+        self._map = mmap.mmap(self._file.fileno(), capacity * SLOT_SIZE)
+
+
+def _index_down(node: Any, index: HeightIndex, block: Any, steps: int, max_steps: int) -> int:
+    """Index *block* and its ancestors until a slot below already holds the right parent.
+
+    Empty slots are only filled while *steps* < *max_steps*; slots holding
+    another hash (an old fork) are always rewritten, because later passes
+    trust everything below a matching slot.  Returns the updated step count.
+    """
+    while True:
+        index.set(block.height, block.expr_id)
+        steps += 1
+        prev_hash = block.previous_block_hash
+        if block.height == 0 or not prev_hash or prev_hash == ZERO32:
+            return steps
+        below = index.get(block.height - 1)
+        if below == prev_hash or (below is None and steps >= max_steps):
+            return steps
+        block = block.previous_block or get_block_from_storage(node, prev_hash)
+
+
+def extend_height_index(node: Any, index: HeightIndex, tip: Any, *, max_steps: int) -> None:
+    """Bring *index* in line with the chain ending at *tip*.
+
+    Walks back from the tip overwriting slots until it meets a hash that is
+    already indexed (the fork point after a reorg), then spends what is left
+    of *max_steps* backfilling below ``index.floor``.  A reorg is always
+    rewritten down to its fork point, even past *max_steps*: stopping
+    partway would leave old-fork hashes that no later tick revisits, since
+    the tip slot already matches.  Older blocks are decoded straight from
+    storage so the walk does not churn the block cache.
+    """
+    if tip is None or tip.expr_id is None:
+        return
+    if len(index) > tip.height + 1:
+        index.truncate(tip.height + 1)
+
+    steps = 0
+    if index.get(tip.height) != tip.expr_id:
+        steps = _index_down(node, index, tip, steps, max_steps)
+
+    while index.floor > 0 and steps < max_steps:
+        block_hash = index.get(index.floor)
+        if block_hash is None:
+            return
+        block = get_block_from_storage(node, block_hash)
+        prev_hash = block.previous_block_hash
+        if not prev_hash or prev_hash == ZERO32:
+            return
+        steps = _index_down(node, index, get_block_from_storage(node, prev_hash), steps, max_steps)
+
+
+def sync_height_range(
+    index: Any,
+    height_index: HeightIndex,
+    *,
+    max_blocks: int,
+    index_height: Callable[[int, bytes], None],
+) -> int:
+    """Bring a per-height *index* in line with *height_index*, one block at a time.
+
+    *index* covers a contiguous range ``[floor, top]`` and provides
+    ``covers``, ``block_hash`` and ``truncate``; *index_height(height,
+    block_hash)* records one block.  Heights whose block changed in a reorg
+    are dropped first, then new blocks above the covered range are indexed,
+    then the range is backfilled toward genesis.  At most *max_blocks*
+    blocks are indexed; returns how many were, so callers can tell when
+    they have caught up.
+    """
+    tip_height = len(height_index) - 1
+    if tip_height < 0:
+        return 0
+
+    top = index.top
+    while top is not None and top >= index.floor:
+        expected = height_index.get(top) if top <= tip_height else None
+        if expected is not None and expected == index.block_hash(top):
+            break
+        index.truncate(top)
+        top = index.top
+
+    if index.top is None:
+        forward = range(tip_height, tip_height + 1)
+        floor = tip_height
+    else:
+        forward = range(index.top + 1, tip_height + 1)
+        floor = index.floor
+    indexed = 0
+    for height in itertools.chain(forward, range(floor - 1, -1, -1)):
+        if indexed >= max_blocks:
+            break
+        if index.covers(height, height):
+            continue
+        block_hash = height_index.get(height)
+        if block_hash is None:
+            # Not in the height index yet (still backfilling); try next time.
+            break
+        index_height(height, block_hash)
+        indexed += 1
+    return indexed
+
+
+def get_block_by_height(node: Any, height: int) -> Optional[Any]:
+    """Return the block at *height* on the node's chain, or None.
+
+    Uses the node's height index when it covers *height* and falls back to
+    the bloom-tree walk from the latest block otherwise.
+    """
+    index = getattr(node, "height_index", None)
+    if index is not None:
+        block_hash = index.get(height)
+        if block_hash is not None:
+            return get_cached_block(node, block_hash)
+    return find_block_by_height(
+        node,
+        starting_block=node.latest_block,
+        target_height=height,
+    )
@@ -1,10 +1,121 @@
 import threading
 import time
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
 
+from utils.block_cache import get_cached_block
 from utils.config import persist_node_latest_block_hash
 from utils.forks import persist_node_forks
+from utils.height_index import HeightIndex, extend_height_index
+from utils.metrics import Histogram
+
+poller_loop_seconds = Histogram(
+    "astreum_poller_loop_seconds",
+    "Duration of one latest-block poller pass.",
+)
+
+
+def add_latest_block_listener(node, listener: Callable[[Any], None]) -> None:
+    """Call *listener* from the poller thread with each newly decoded latest block."""
+    listeners = getattr(node, "latest_block_listeners", None)
+    if listeners is None:
+        listeners = node.latest_block_listeners = []
+    listeners.append(listener)
+
+
+def remove_latest_block_listener(node, listener: Callable[[Any], None]) -> None:
+    listeners = getattr(node, "latest_block_listeners", None)
+    if listeners and listener in listeners:
+        listeners.remove(listener)
+
+
+def _notify_latest_block_listeners(node, block) -> None:
+    for listener in list(getattr(node, "latest_block_listeners", None) or ()):
+        try:
+            listener(block)
+        except Exception as exc:
+            if node.logger:
+                node.logger.debug(
+                    "Latest block listener failed: %s: %s", type(exc).__name__, exc,
+                )
+
+
+def add_height_index_listener(node, listener: Callable[[int], None]) -> None:
+    """Call *listener* from the poller thread with the new length after a pass resizes the height index."""
+    listeners = getattr(node, "height_index_listeners", None)
+    if listeners is None:
+        listeners = node.height_index_listeners = []
+    listeners.append(listener)
+
+
+def remove_height_index_listener(node, listener: Callable[[int], None]) -> None:
+    listeners = getattr(node, "height_index_listeners", None)
+    if listeners and listener in listeners:
+        listeners.remove(listener)
+
+
+def _notify_height_index_listeners(node, length: int) -> None:
+    for listener in list(getattr(node, "height_index_listeners", None) or ()):
+        try:
+            listener(length)
+        except Exception as exc:
+            if node.logger:
+                node.logger.debug(
+                    "Height index listener failed: %s: %s", type(exc).__name__, exc,
+                )
+
+
+def start_index_worker(
+    *,
+    node,
+    name: str,
+    sync: Callable[[], int],
+    idle_interval: float,
+    on_stop: Callable[[], None],
+) -> Callable[[], None]:
+    """
+    Start a background thread that keeps a derived index in sync with the chain.
+
+    *sync* runs one bounded pass and returns how many blocks it indexed.
+    Passes run back to back while there is backlog; otherwise the thread
+    sleeps until a new latest block arrives or *idle_interval* elapses.
+    *on_stop* releases the index once the thread has exited.
+
+    Returns a callable to stop the worker; it waits for thread exit when invoked.
+    """
+    stop_event = threading.Event()
+    wake_event = threading.Event()
+
+    def _on_latest_block(_block: Any) -> None:
+        wake_event.set()
+
+    add_latest_block_listener(node, _on_latest_block)
+
+    def _run() -> None:
+        logger = node.logger
+        while not stop_event.is_set():
+            indexed = 0
+            try:
+                indexed = sync()
+            except Exception as exc:
+                if logger:
+                    logger.debug("%s sync failed: %s: %s", name, type(exc).__name__, exc)
+            if indexed == 0:
+                wake_event.wait(idle_interval)
+                wake_event.clear()
+
+    thread = threading.Thread(target=_run, name=name, daemon=True)
+    thread.start()
+
+    def _stop() -> None:
+        stop_event.set()
+        wake_event.set()
+        remove_latest_block_listener(node, _on_latest_block)
+        thread.join(timeout=max(idle_interval, 0.5) * 2)
+        if not thread.is_alive():
+            on_stop()
+
+    return _stop
 
 
 def start_latest_block_hash_poller(
@@ -12,13 +123,21 @@ def start_latest_block_hash_poller(
     node,
     data_dir: Path,
     poll_interval: float,
+    height_index_sync_steps: int = 4096,
 ) -> Callable[[], None]:
     """
     Start a background thread that persists the latest block hash when it changes.
 
+    The poller also keeps the height index in *data_dir* in sync with the
+    latest block (exposed as ``node.height_index``), spending at most
+    *height_index_sync_steps* block decodes per tick on reorgs and backfill.
+    Height index listeners are told whenever a tick changes its length.
+
     Returns a callable to stop the poller; it waits for thread exit when invoked.
     """
     stop_event = threading.Event()
+    height_index = HeightIndex.open(data_dir)
+    node.height_index = height_index
 
     def _poll() -> None:
         last_written: Optional[bytes] = None
@@ -28,9 +147,14 @@ def start_latest_block_hash_poller(
         if logger:
             logger.info("Block hash poller started (interval=%ss)", interval)
         while not stop_event.is_set():
+            started = time.perf_counter()
             try:
                 with node.latest_block_lock:
                     current = node.latest_block_hash
+                seen = getattr(node, "_latest_block_hash_seen", None)
+                if current is not None and (seen is None or seen[0] != current):
+                    # When the poller first saw this hash, for the decode lag metric.
+                    node._latest_block_hash_seen = (current, time.monotonic())
                 if current is None:
                     node.latest_block = None
                     if logger:
@@ -46,17 +170,30 @@ def start_latest_block_hash_poller(
                         )
                     try:
                         if logger:
-                            logger.debug("Calling get_block_from_storage for %s", current.hex()[:16])
-                        from astreum.consensus.block.encoding.decode import get_block_from_storage
-                        node.latest_block = get_block_from_storage(node, current)
+                            logger.debug("Calling get_cached_block for %s", current.hex()[:16])
+                        node.latest_block = get_cached_block(node, current)
                         if logger:
-                            logger.debug("get_block_from_storage succeeded for %s", current.hex()[:16])
+                            logger.debug("get_cached_block succeeded for %s", current.hex()[:16])
+                        indexed_length = len(height_index)
+                        try:
+                            extend_height_index(
+                                node,
+                                height_index,
+                                node.latest_block,
+                                max_steps=height_index_sync_steps,
+                            )
+                        except Exception as exc:
+                            if logger:
+                                logger.debug("Height index sync failed: %s: %s", type(exc).__name__, exc)
+                        if len(height_index) != indexed_length:
+                            _notify_height_index_listeners(node, len(height_index))
                         if current != last_written:
                             last_written = current
                             try:
                                 persist_node_forks(data_dir=data_dir, node=node)
                             except Exception:
                                 pass
+                            _notify_latest_block_listeners(node, node.latest_block)
                     except Exception as exc:
                         node.latest_block = None
                         attempts = getattr(node, "_block_fetch_attempts", 0)
@@ -68,6 +205,7 @@ def start_latest_block_hash_poller(
                             )
             except Exception:
                 pass
+            poller_loop_seconds.observe(time.perf_counter() - started)
             stop_event.wait(interval)
 
     thread = threading.Thread(target=_poll, name="latest-block-hash-poller", daemon=True)
@@ -76,5 +214,8 @@ def start_latest_block_hash_poller(
     def _stop() -> None:
         stop_event.set()
         thread.join(timeout=poll_interval * 2 if poll_interval > 0 else 0.5)
+        if not thread.is_alive():
+            node.height_index = None
+            height_index.close()
 
     return _stop
@@ -0,0 +1,288 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from astreum.consensus.block.encoding.decode import get_block_from_storage
+from astreum.expression import ZERO32
+from astreum.storage.get.single import get_expr
+
+from utils.height_index import sync_height_range
+from utils.latest_block import start_index_worker
+
+TX_INDEX_FILE_NAME = "tx_index.sqlite3"
+FIND_BATCH_SIZE = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    height INTEGER PRIMARY KEY,
+    block_hash BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS txs (
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    tx_hash BLOB NOT NULL,
+    sender BLOB NOT NULL,
+    recipient BLOB NOT NULL,
+    PRIMARY KEY (height, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS txs_by_sender ON txs (sender, height);
+CREATE INDEX IF NOT EXISTS txs_by_recipient ON txs (recipient, height);
+CREATE INDEX IF NOT EXISTS txs_by_hash ON txs (tx_hash);
+"""
+
+
+class TxIndex:
+    """On-disk index of transactions by sender, recipient and hash.
+
+    Covers a contiguous height range ``[floor, top]`` of the chain recorded
+    in the height index; every covered block has a ``blocks`` row, even if
+    it holds no transactions, so the covered range survives restarts and
+    backfill resumes where it stopped.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.floor: Optional[int] = None
+        self.top: Optional[int] = None
+        self._load_range()
+
+    @classmethod
+    def open(cls, data_dir: Path) -> "TxIndex":
+        return cls(Path(data_dir) / TX_INDEX_FILE_NAME)
+
+    def _load_range(self) -> None:
+        self.floor, self.top = self._conn.execute(
+            "SELECT MIN(height), MAX(height) FROM blocks"
+        ).fetchone()
+
+    def reload(self) -> None:
+        """Re-read the covered range, e.g. after another process added blocks."""
+        with self._lock:
+            self._load_range()
+
+    def covers(self, low: int, high: int) -> bool:
+        """Return True if every height in ``[low, high]`` is indexed."""
+        floor, top = self.floor, self.top
+        return floor is not None and floor <= low and high <= top
+
+    def block_hash(self, height: int) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT block_hash FROM blocks WHERE height = ?", (height,)
+            ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def add_block(self, height: int, block_hash: bytes, txs: list[tuple[bytes, bytes, bytes]]) -> None:
+        """Record block *height* and its ``(tx_hash, sender, recipient)`` entries atomically."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blocks (height, block_hash) VALUES (?, ?)",
+                    (height, block_hash),
+                )
+                self._conn.execute("DELETE FROM txs WHERE height = ?", (height,))
+                self._conn.executemany(
+                    "INSERT INTO txs (height, position, tx_hash, sender, recipient) VALUES (?, ?, ?, ?, ?)",
+                    [(height, position, *tx) for position, tx in enumerate(txs)],
+                )
+            self.floor = height if self.floor is None else min(self.floor, height)
+            self.top = height if self.top is None else max(self.top, height)
+
+    def truncate(self, height: int) -> None:
+        """Drop every indexed block at or above *height* (used on reorgs)."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.execute("DELETE FROM blocks WHERE height >= ?", (height,))
+                self._conn.execute("DELETE FROM txs WHERE height >= ?", (height,))
+            self._load_range()
+
+    def find(
+        self,
+        *,
+        tx_hash: Optional[bytes] = None,
+        sender: Optional[bytes] = None,
+        recipient: Optional[bytes] = None,
+        high: int,
+        low: int = 0,
+        start_position: int = 0,
+        batch_size: int = FIND_BATCH_SIZE,
+    ) -> Iterator[tuple[int, int, bytes, bytes]]:
+        """Yield ``(height, position, tx_hash, block_hash)`` matches from *high* down to *low*.
+
+        At least one of *tx_hash*, *sender* or *recipient* must be given.
+        Matches in block *high* before *start_position* are skipped.  Rows
+        are read *batch_size* at a time, each batch under the lock, so a
+        caller that stops early never loads the rest of the matches.
+        """
+        filters = ""
+        values: list[Any] = []
+        for column, value in (("tx_hash", tx_hash), ("sender", sender), ("recipient", recipient)):
+            if value:
+                filters += f" AND t.{column} = ?"
+                values.append(value)
+        if not values:
+            raise ValueError("TxIndex.find needs tx_hash, sender or recipient")
+        query = (
+            "SELECT t.height, t.position, t.tx_hash, b.block_hash FROM txs t"
+            " JOIN blocks b ON b.height = t.height"
+            " WHERE t.height BETWEEN ? AND ? AND (t.height < ? OR t.position >= ?)"
+            f"{filters}"
+            " ORDER BY t.height DESC, t.position"
+            " LIMIT ?"
+        )
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    query, [low, high, high, start_position, *values, batch_size]
+                ).fetchall()
+            for height, position, found_hash, block_hash in rows:
+                yield height, position, bytes(found_hash), bytes(block_hash)
+            if len(rows) < batch_size:
+                return
+            # Resume right after the last row served.
+            high, start_position = rows[-1][0], rows[-1][1] + 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def block_tx_hashes(node: Any, block: Any) -> list[bytes]:
+    """Return the hashes in *block*'s transactions list, in block order."""
+    link_hash = block.transactions_hash
+    hashes: list[bytes] = []
+    while link_hash and link_hash != ZERO32:
+        link = get_expr(node, link_hash)
+        if link is None:
+            raise ValueError(f"transactions list link {link_hash.hex()[:16]} not found")
+        if link.base != "link" or link.head_hash is None:
+            break
+        hashes.append(link.head_hash)
+        link_hash = link.tail_hash
+    return hashes
+
+
+def transaction_matches(
+    tx: Any,
+    *,
+    tx_hash: bytes,
+    sender: bytes,
+    receiver: bytes,
+    key: bytes,
+) -> bool:
+    """Match *tx* the way ``bloom_search_tx`` does; empty or zero filters match anything."""
+    for wanted, actual in ((tx_hash, tx.hash), (sender, tx.sender), (receiver, tx.recipient)):
+        if wanted and wanted != ZERO32 and actual != wanted:
+            return False
+    if key and key != ZERO32:
+        data = tx.data.value if tx.data is not None and tx.data.base == "bytes" else b""
+        if data != key:
+            return False
+    return True
+
+
+def _child(node: Any, link: Any, *, head: bool) -> Optional[Any]:
+    """Return the shallow head or tail of *link*, loading it by hash unless it is inline."""
+    inline = link.head if head else link.tail
+    if inline is not None:
+        return inline
+    child_hash = link.head_hash if head else link.tail_hash
+    if child_hash is None or child_hash == ZERO32:
+        return None
+    child = get_expr(node, child_hash)
+    if child is None:
+        raise ValueError(f"expr {child_hash.hex()[:16]} not found")
+    return child
+
+
+def _transaction_parties(node: Any, tx_hash: bytes) -> tuple[bytes, bytes]:
+    """Return ``(sender, recipient)`` of a stored transaction.
+
+    Walks the shallow expressions down to the body
+    (``[[body, signature], transaction]``, body fields sorted by name) and
+    loads just those two fields, rather than resolving the whole
+    transaction and its data payload.
+    """
+    root = get_expr(node, tx_hash)
+    if root is None or root.base != "link":
+        raise ValueError(f"transaction {tx_hash.hex()[:16]} not found")
+    inner = _child(node, root, head=True)
+    link = _child(node, inner, head=True) if inner is not None and inner.base == "link" else None
+    fields = []
+    position = 0
+    # The list ends at nil, a link with no head.
+    while link is not None and link.base == "link" and (link.head is not None or link.head_hash is not None):
+        if position in (6, 7):
+            fields.append(_child(node, link, head=True))
+        position += 1
+        link = _child(node, link, head=False)
+    if position != 8:
+        raise ValueError(f"malformed transaction {tx_hash.hex()[:16]}")
+    recipient, sender = fields
+    if recipient is None or sender is None or recipient.base != "bytes" or sender.base != "bytes":
+        raise ValueError(f"malformed transaction {tx_hash.hex()[:16]}")
+    return sender.value, recipient.value
+
+
+def _index_height(node: Any, tx_index: TxIndex, height: int, block_hash: bytes) -> None:
+    block = get_block_from_storage(node, block_hash)
+    entries = []
+    for tx_hash in block_tx_hashes(node, block):
+        entries.append((tx_hash, *_transaction_parties(node, tx_hash)))
+    tx_index.add_block(height, block_hash, entries)
+
+
+def sync_tx_index(node: Any, tx_index: TxIndex, height_index: Any, *, max_blocks: int) -> int:
+    """Bring *tx_index* in line with *height_index*, indexing at most *max_blocks* blocks."""
+    return sync_height_range(
+        tx_index,
+        height_index,
+        max_blocks=max_blocks,
+        index_height=lambda height, block_hash: _index_height(node, tx_index, height, block_hash),
+    )
+
+
+def start_tx_index_worker(
+    *,
+    node: Any,
+    data_dir: Path,
+    sync_steps: int,
+    idle_interval: float,
+) -> Callable[[], None]:
+    """
+    Start a background thread that maintains the transaction index in *data_dir*.
+
+    The index is exposed as ``node.tx_index``.  Each pass indexes up to
+    *sync_steps* blocks against ``node.height_index`` (kept by the
+    latest-block poller); backfill is resumable across restarts.
+
+    Returns a callable to stop the worker; it waits for thread exit when invoked.
+    """
+    tx_index = TxIndex.open(data_dir)
+    node.tx_index = tx_index
+
+    def _sync() -> int:
+        height_index = getattr(node, "height_index", None)
+        if height_index is None:
+            return 0
+        return sync_tx_index(node, tx_index, height_index, max_blocks=sync_steps)
+
+    def _close() -> None:
+        node.tx_index = None
+        tx_index.close()
+
+    return start_index_worker(
+        node=node,
+        name="tx-index-worker",
+        sync=_sync,
+        idle_interval=idle_interval,
+        on_stop=_close,
+    )
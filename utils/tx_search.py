@@ -0,0 +1,358 @@
+"""Transaction search over a height range, shared by the API and the TUI.
+
+The range is answered from the transaction index when it covers it, and
+otherwise scanned era by era (ERA_SIZE blocks, one bloom tree each)
+through the bloom matrix or the stored bloom trees.  Eras are independent,
+so they are scanned on a shared thread pool and merged back in descending
+height order; once *limit* results are confirmed the remaining eras are
+cancelled.
+
+Every search runs under a ``SearchBudget``.  When it runs out the scan
+stops at a block boundary and reports where, so callers can return the
+results so far with a resume point instead of failing.
+"""
+
+import base64
+import binascii
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional
+
+from astreum.consensus.block.encoding.decode import get_block_from_storage
+from astreum.consensus.transaction.from_storage import get_transaction_from_storage
+from astreum.crypto.bloom_search import ERA_SIZE
+from astreum.crypto.bloom_tree.tree import bloom_search_storage
+from astreum.expression import ZERO32
+
+from utils.height_index import get_block_by_height
+from utils.tx_index import block_tx_hashes, transaction_matches
+
+DEFAULT_SEARCH_WORKERS = 4
+
+# A match is (height, position in the block's transaction list, transaction).
+Match = tuple[int, int, Any]
+# A resume point is (height, position, block_hash): scan that block from position on.
+ResumePoint = tuple[int, int, bytes]
+# A chunk scans one era and returns its matches, plus the resume point if
+# the budget ran out before it finished.
+ChunkResult = tuple[list[Match], Optional[ResumePoint]]
+Chunk = Callable[[threading.Event], ChunkResult]
+
+_CURSOR = struct.Struct(">QI")
+
+_search_pool: Optional[ThreadPoolExecutor] = None
+_search_workers = DEFAULT_SEARCH_WORKERS
+_pool_lock = threading.Lock()
+
+
+def configure_search_workers(cli_configs: dict[str, Any]) -> None:
+    """Apply ``cli.search_workers``, the number of eras scanned in parallel (1 = sequential)."""
+    global _search_pool, _search_workers
+    with _pool_lock:
+        if _search_pool is not None:
+            _search_pool.shutdown(wait=False, cancel_futures=True)
+            _search_pool = None
+        _search_workers = max(1, int(cli_configs.get("search_workers", DEFAULT_SEARCH_WORKERS)))
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _search_pool
+    with _pool_lock:
+        if _search_pool is None:
+            _search_pool = ThreadPoolExecutor(
+                max_workers=_search_workers,
+                thread_name_prefix="astreum-search",
+            )
+        return _search_pool
+
+
+class SearchBudget:
+    """Limits on one search: blocks decoded and wall-clock time.
+
+    Shared by all chunks of a search, so parallel eras draw on the same
+    allowance.  ``exhausted`` names the limit that ran out, if any.
+    """
+
+    def __init__(self, *, max_blocks: Optional[int] = None, timeout: Optional[float] = None) -> None:
+        self.max_blocks = max_blocks
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.blocks_scanned = 0
+        self.exhausted: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _check_deadline(self) -> bool:
+        if self.exhausted is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.exhausted = "timeout"
+        return self.exhausted is None
+
+    def expired(self) -> bool:
+        """Return True if the budget has run out, without spending any of it."""
+        with self._lock:
+            return not self._check_deadline()
+
+    def take_block(self) -> bool:
+        """Spend one block scan; return False if the budget has run out."""
+        with self._lock:
+            if not self._check_deadline():
+                return False
+            if self.max_blocks is not None and self.blocks_scanned >= self.max_blocks:
+                self.exhausted = "max_blocks_scanned"
+                return False
+            self.blocks_scanned += 1
+            return True
+
+
+def search_element(*, tx_hash: bytes, sender: bytes, receiver: bytes, key: bytes) -> bytes:
+    """Build the bloom element ``bloom_search_tx`` looks up for these filters."""
+    return b"".join((value or ZERO32).ljust(32, b"\x00")[:32] for value in (tx_hash, sender, receiver, key))
+
+
+def _scan_block(node: Any, block: Any, filters: dict[str, bytes]) -> list[Match]:
+    matches = []
+    for position, tx_hash in enumerate(block_tx_hashes(node, block)):
+        try:
+            tx = get_transaction_from_storage(node, tx_hash)
+        except ValueError:
+            continue
+        if transaction_matches(tx, **filters):
+            tx.block_hash = block.expr_id
+            matches.append((block.height, position, tx))
+    return matches
+
+
+def _tree_chunk(
+    node: Any,
+    era_block: Callable[[], Any],
+    low: int,
+    high: int,
+    element: bytes,
+    filters: dict[str, bytes],
+    budget: SearchBudget,
+) -> Chunk:
+    """Scan one era through the bloom tree of its last block in range."""
+
+    def _scan(cancel: threading.Event) -> ChunkResult:
+        owner = era_block()
+        if owner is None or not owner.bloom_hash or owner.bloom_hash == ZERO32:
+            return [], None
+        if budget.expired():
+            return [], (owner.height, 0, owner.expr_id)
+        blocks = {}
+        for leaf_hash in bloom_search_storage(owner.bloom_hash, element, node):
+            if cancel.is_set():
+                return [], None
+            if leaf_hash is None:
+                # Leaf without a block pointer: the tree owner's own transactions.
+                block = owner
+            else:
+                try:
+                    block = get_block_from_storage(node, leaf_hash)
+                except ValueError:
+                    continue
+            if low <= block.height <= high:
+                blocks[block.expr_id] = block
+
+        matches: list[Match] = []
+        for block in sorted(blocks.values(), key=lambda block: block.height, reverse=True):
+            if cancel.is_set():
+                break
+            if not budget.take_block():
+                return matches, (block.height, 0, block.expr_id)
+            matches.extend(_scan_block(node, block, filters))
+        return matches, None
+
+    return _scan
+
+
+def _matrix_chunk(
+    node: Any,
+    matrix: Any,
+    low: int,
+    high: int,
+    element: bytes,
+    filters: dict[str, bytes],
+    budget: SearchBudget,
+) -> Chunk:
+    """Scan one era's candidate blocks from the bloom matrix."""
+
+    def _scan(cancel: threading.Event) -> ChunkResult:
+        matches: list[Match] = []
+        for height, block_hash in matrix.candidates(element, high=high, low=low):
+            if cancel.is_set():
+                break
+            if not budget.take_block():
+                return matches, (height, 0, block_hash)
+            try:
+                block = get_block_from_storage(node, block_hash)
+            except ValueError:
+                continue
+            matches.extend(_scan_block(node, block, filters))
+        return matches, None
+
+    return _scan
+
+
+def _indexed_steps(
+    node: Any,
+    tx_index: Any,
+    filters: dict[str, bytes],
+    high: int,
+    low: int,
+    start_position: int,
+    budget: SearchBudget,
+) -> Iterator[ChunkResult]:
+    """Load indexed matches one at a time, charging the budget once per block."""
+    last_height = None
+    for height, position, found_hash, block_hash in tx_index.find(
+        tx_hash=filters["tx_hash"] or None,
+        sender=filters["sender"] or None,
+        recipient=filters["receiver"] or None,
+        high=high,
+        low=low,
+        start_position=start_position,
+    ):
+        if height != last_height:
+            if not budget.take_block():
+                yield [], (height, position, block_hash)
+                return
+            last_height = height
+        try:
+            tx = get_transaction_from_storage(node, found_hash)
+        except ValueError:
+            continue
+        # The index has no data column; key is matched on the loaded transaction.
+        if not transaction_matches(tx, tx_hash=b"", sender=b"", receiver=b"", key=filters["key"]):
+            continue
+        tx.block_hash = block_hash
+        yield [(height, position, tx)], None
+
+
+def _era_ranges(high: int, low: int) -> Iterator[tuple[int, int]]:
+    for era in range(high // ERA_SIZE, low // ERA_SIZE - 1, -1):
+        yield max(low, era * ERA_SIZE), min(high, era * ERA_SIZE + ERA_SIZE - 1)
+
+
+def ordered_chunks(chunks: list[Chunk], workers: int) -> Iterator[ChunkResult]:
+    """Run *chunks* (newest first) with up to *workers* in flight and yield their results in order.
+
+    Closing the iterator cancels chunks that have not started and signals
+    running ones to stop at their next block.
+    """
+    cancel = threading.Event()
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield chunk(cancel)
+        return
+
+    pool = _pool()
+    remaining = iter(chunks)
+    pending: deque = deque()
+    try:
+        for chunk in remaining:
+            pending.append(pool.submit(chunk, cancel))
+            if len(pending) >= workers:
+                break
+        while pending:
+            result = pending.popleft().result()
+            following = next(remaining, None)
+            if following is not None:
+                pending.append(pool.submit(following, cancel))
+            yield result
+    finally:
+        cancel.set()
+        for future in pending:
+            future.cancel()
+
+
+def encode_search_cursor(height: int, position: int, block_hash: bytes) -> str:
+    """Encode a resume point: the block at *height* (*block_hash*) from transaction *position* on."""
+    return base64.urlsafe_b64encode(
+        _CURSOR.pack(height, position) + block_hash
+    ).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> ResumePoint:
+    """Decode a cursor from ``encode_search_cursor``; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    except (binascii.Error, ValueError):
+        raise ValueError("invalid search cursor")
+    if len(raw) != _CURSOR.size + 32:
+        raise ValueError("invalid search cursor")
+    height, position = _CURSOR.unpack_from(raw)
+    return height, position, raw[_CURSOR.size:]
+
+
+def find_transactions(
+    node: Any,
+    *,
+    tx_hash: bytes,
+    sender: bytes,
+    receiver: bytes,
+    key: bytes,
+    start_block: Any,
+    end_height: int,
+    limit: int,
+    start_position: int = 0,
+    budget: Optional[SearchBudget] = None,
+) -> tuple[list, Optional[ResumePoint]]:
+    """Find up to *limit* transactions matching the filters, walking back from *start_block*.
+
+    Same matching rules as ``bloom_search_tx``; each result gets its
+    ``block_hash`` set.  Results are ordered by height, newest first, and by
+    position within a block; matches in *start_block* before
+    *start_position* are skipped.
+
+    Returns the results and, if *limit* was reached or *budget* ran out
+    (see ``budget.exhausted``), the resume point where the next page should
+    start so it continues exactly where this one stopped.
+    """
+    if budget is None:
+        budget = SearchBudget()
+    if start_block is None:
+        return [], None
+    high = start_block.height
+    low = max(0, end_height)
+    if high < low:
+        return [], None
+    filters = dict(tx_hash=tx_hash, sender=sender, receiver=receiver, key=key)
+
+    tx_index = getattr(node, "tx_index", None)
+    if tx_index is not None and (tx_hash or sender or receiver) and tx_index.covers(low, high):
+        steps = _indexed_steps(node, tx_index, filters, high, low, start_position, budget)
+    else:
+        element = search_element(**filters)
+        bloom_matrix = getattr(node, "bloom_matrix", None)
+        chunks: list[Chunk] = []
+        if bloom_matrix is not None and bloom_matrix.covers(low, high):
+            for era_low, era_high in _era_ranges(high, low):
+                chunks.append(_matrix_chunk(node, bloom_matrix, era_low, era_high, element, filters, budget))
+        else:
+            for era_low, era_high in _era_ranges(high, low):
+                if era_high == high:
+                    # The start block may be off the indexed chain; use its own tree.
+                    era_block = lambda: start_block
+                else:
+                    era_block = lambda height=era_high: get_block_by_height(node, height)
+                chunks.append(_tree_chunk(node, era_block, era_low, era_high, element, filters, budget))
+        steps = ordered_chunks(chunks, _search_workers)
+
+    results = []
+    try:
+        for matches, stopped_at in steps:
+            for height, position, tx in matches:
+                if height == high and position < start_position:
+                    continue
+                results.append(tx)
+                if len(results) >= limit:
+                    return results, (height, position + 1, tx.block_hash)
+            if stopped_at is not None:
+                if stopped_at[0] == high:
+                    stopped_at = (high, max(stopped_at[1], start_position), stopped_at[2])
+                return results, stopped_at
+    finally:
+        steps.close()
+    return results, None